@@ -1,15 +1,33 @@
 #!/usr/bin/env python3
 
-from chai.MainApp import LayoutApp
 import sys
 import os
 
 if __name__ == "__main__":
 
+    # profiling must be enabled before the views are imported. Only --profile and --profile=FILE are accepted, a
+    # separate FILE argument could not be told apart from a dmap file.
+    from chai import Profiling
+    for arg in sys.argv[1:]:
+        if arg == "--profile" or arg.startswith("--profile="):
+            sys.argv.remove(arg)
+            Profiling.enable(arg.partition("=")[2] or None, Profiling.window_from_environment())
+            break
+    else:
+        Profiling.enable_from_environment()
+
+    if len(sys.argv) > 1 and sys.argv[1].startswith("-"):
+        # headless mode, which must not import Textual to start fast
+        from chai import Cli
+        sys.exit(Cli.main(sys.argv[1:]))
+
     if len(sys.argv) > 1:
-        if not os.path.isfile(sys.argv[1]):
+        # a dmap file or a recording directory, see DeviceView.is_recording(), which would import Textual
+        isRecording = os.path.isfile(os.path.join(sys.argv[1], "meta.json"))
+        if not os.path.isfile(sys.argv[1]) and not isRecording:
             print(f'Error: File "{sys.argv[1]}" does not exist!')
             sys.exit(1)
 
-    app = LayoutApp()
+    from chai.MainApp import LayoutApp
+    app = LayoutApp(initialPath=sys.argv[1] if len(sys.argv) > 1 else None)
     app.run()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import deviceaccess as da
+
+
+class AccessorCache:
+    """
+    Bounded cache of register accessors with least-recently-used eviction, so switching back to a register does not
+    create its accessors again. Keys are (device alias, register path, user type, access mode flags).
+    """
+    maxSize: int
+    hits: int
+    misses: int
+
+    def __init__(self, maxSize: int = 64):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self._accessors: OrderedDict[tuple, da.TransferElementBase] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._accessors)
+
+    @staticmethod
+    def key(deviceAlias: str | None, path: str, npType, flags: list[da.AccessMode]) -> tuple:
+        return (deviceAlias, path, str(npType), tuple(str(flag) for flag in flags))
+
+    def get(self, key: tuple, create: Callable[[], da.TransferElementBase]) -> da.TransferElementBase:
+        accessor = self._accessors.get(key)
+        if accessor is not None:
+            self.hits += 1
+            self._accessors.move_to_end(key)
+            return accessor
+
+        self.misses += 1
+        accessor = create()
+        self._accessors[key] = accessor
+        while len(self._accessors) > self.maxSize:
+            self._accessors.popitem(last=False)
+        return accessor
+
+    def invalidate(self, deviceAlias: str | None = None) -> None:
+        """Drop all accessors of the given device, or all accessors if no device is given."""
+        if deviceAlias is None:
+            self._accessors.clear()
+            return
+        for key in [key for key in self._accessors if key[0] == deviceAlias]:
+            del self._accessors[key]
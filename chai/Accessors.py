@@ -0,0 +1,84 @@
+import numpy as np
+import deviceaccess as da
+
+from chai.AccessorCache import AccessorCache
+
+
+def get_raw_numpy_type(raw_type):
+    conversion = {
+        "none": None, "int8": np.int8, "uint8": np.uint8, "int16": np.int16,
+        "uint16": np.uint16, "int32": np.int32, "uint32": np.uint32, "int64": np.int64,
+        "uint64": np.uint64, "float32": np.float32, "float64": np.float64, "string": str,
+        "Boolean": bool, "Void": "void", "unknown": "unknown"}
+    return conversion[raw_type.getAsString()]
+
+
+class AccessorHolder:
+    def __init__(self, accessor: da.TransferElementBase, info: da.RegisterInfo,
+                 dummyWriteAccessor: da.TransferElementBase | None, npType, flags: list[da.AccessMode]):
+        self.accessor = accessor
+        self.dummyWriteAccessor = dummyWriteAccessor
+        self.info = info
+        self.npType = npType
+        self.flags = flags
+    accessor: da.TransferElementBase
+    dummyWriteAccessor: da.TransferElementBase | None
+    info: da.RegisterInfo
+    npType: type | str | None
+    flags: list[da.AccessMode]
+
+    def createReadAccessor(self, device: da.Device) -> da.TransferElementBase:
+        """Create an additional accessor to the same register, e.g. for reading from a worker thread."""
+        path = str(self.info.getRegisterName())
+        if isinstance(self.accessor, da.TwoDRegisterAccessor):
+            return device.getTwoDRegisterAccessor(self.npType, path, accessModeFlags=self.flags)
+        return device.getVoidRegisterAccessor(path, accessModeFlags=self.flags)
+
+
+def needs_async_read(info: da.RegisterInfo) -> bool:
+    """Whether the accessor created by create_accessor_holder() requires activateAsyncRead() on the device."""
+    return da.AccessMode.wait_for_new_data in info.getSupportedAccessModes()
+
+
+def create_accessor_holder(device: da.Device, catalogue: da.RegisterCatalogue, path: str,
+                           cache: AccessorCache | None = None, deviceAlias: str | None = None) -> AccessorHolder:
+    """
+    Accessors to a register as Chai shows it: raw if supported, push-type (wait_for_new_data) if supported, plus the
+    .DUMMY_WRITEABLE register for writing read-only registers of dummy devices. Accessors are taken from the cache if
+    given.
+    """
+    info = catalogue.getRegister(path)
+
+    dd = info.getDataDescriptor()
+    if da.AccessMode.raw in info.getSupportedAccessModes():
+        # raw transfers are supported
+        np_type = get_raw_numpy_type(dd.rawDataType())
+        flags = [da.AccessMode.raw]
+    else:
+        # no raw transfer supported
+        np_type = get_raw_numpy_type(dd.minimumDataType())
+        flags = []
+
+    dummyWriteFlags = flags
+
+    if needs_async_read(info):
+        # we cannot use raw and wait_for_new_data at the same time
+        flags = [da.AccessMode.wait_for_new_data]
+
+    dummyWritePath = path+".DUMMY_WRITEABLE"
+    dummyWrite = not info.isWriteable() and catalogue.hasRegister(dummyWritePath)
+    isVoid = dd.fundamentalType() == da.FundamentalType.nodata
+
+    def getAccessor(path: str, flags: list[da.AccessMode]) -> da.TransferElementBase:
+        if isVoid:
+            def create(): return device.getVoidRegisterAccessor(path, accessModeFlags=flags)
+        else:
+            def create(): return device.getTwoDRegisterAccessor(np_type, path, accessModeFlags=flags)
+        if cache is None:
+            return create()
+        return cache.get(cache.key(deviceAlias, path, "void" if isVoid else np_type, flags), create)
+
+    accessor = getAccessor(path, flags)
+    dummyWriteAccessor = getAccessor(dummyWritePath, dummyWriteFlags) if dummyWrite else None
+
+    return AccessorHolder(accessor, info, dummyWriteAccessor, np_type, flags)
@@ -0,0 +1,251 @@
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+import numpy as np
+import deviceaccess as da
+
+
+class Frame:
+    """
+    Snapshot of a register's content, decoupled from the accessor buffer it was read into. The time.monotonic()
+    stamps of when the read was scheduled (polls only), requested and completed are used to measure the latency.
+    """
+    data: np.ndarray | None
+    timestamp: datetime
+    version: da.VersionNumber | None
+    sequence: int
+    scheduled: float | None
+    requested: float
+    transferred: float
+
+    def __init__(self, data: np.ndarray | None, timestamp: datetime, version: da.VersionNumber | None,
+                 sequence: int, scheduled: float | None = None, requested: float = 0., transferred: float = 0.):
+        self.data = data
+        self.timestamp = timestamp
+        self.version = version
+        self.sequence = sequence
+        self.scheduled = scheduled
+        self.requested = requested
+        self.transferred = transferred
+
+
+def copy_frame_data(accessor: da.TransferElementBase) -> np.ndarray | None:
+    if not isinstance(accessor, da.TwoDRegisterAccessor):
+        # void registers do not carry any data
+        return None
+    return np.array(accessor.get(), copy=True)
+
+
+class PollAcquisition:
+    """
+    Polls a register at a fixed rate. run() blocks and is meant to be executed in a worker thread. The accessor is
+    owned by the acquisition, each read is copied into a Frame and handed over through onFrame.
+    """
+    accessor: da.TransferElementBase
+    hz: float
+
+    def __init__(self, accessor: da.TransferElementBase, hz: float, onFrame: Callable[[Frame], None],
+                 onError: Callable[[RuntimeError], None]):
+        self.accessor = accessor
+        self.hz = hz
+        self._onFrame = onFrame
+        self._onError = onError
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self) -> None:
+        sequence = 0
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            requested = time.monotonic()
+            try:
+                self.accessor.readLatest()
+            except RuntimeError as e:
+                self._onError(e)
+                return
+            transferred = time.monotonic()
+            sequence += 1
+            self._onFrame(Frame(copy_frame_data(self.accessor), datetime.now(),
+                          self.accessor.getVersionNumber(), sequence, deadline, requested, transferred))
+
+            deadline += 1 / self.hz
+            now = time.monotonic()
+            if deadline < now:
+                # the device is slower than the requested rate, do not try to catch up with a burst of reads.
+                # ReadTiming counts the missed deadlines from the frame stamps.
+                deadline = now
+            self._stop.wait(deadline - now)
+
+
+class PushAcquisition:
+    """
+    Receives the updates of a register with wait_for_new_data. run() blocks and is meant to be executed in a worker
+    thread, stop() interrupts a pending read.
+    """
+    accessor: da.TransferElementBase
+
+    def __init__(self, accessor: da.TransferElementBase, onFrame: Callable[[Frame], None],
+                 onError: Callable[[RuntimeError], None]):
+        self.accessor = accessor
+        self._onFrame = onFrame
+        self._onError = onError
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.accessor.interrupt()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self) -> None:
+        sequence = 0
+        while not self._stop.is_set():
+            requested = time.monotonic()
+            try:
+                self.accessor.read()
+            except RuntimeError as e:
+                self._onError(e)
+                return
+            except da.ThreadInterrupted:
+                return
+            transferred = time.monotonic()
+            sequence += 1
+            self._onFrame(Frame(copy_frame_data(self.accessor), datetime.now(),
+                          self.accessor.getVersionNumber(), sequence, None, requested, transferred))
+
+
+class LatestFrame:
+    """
+    Latest-value-wins hand-over of frames from an acquisition thread to the UI. Frames which are replaced before the
+    UI takes them are not rendered and counted as coalesced.
+    """
+    received: int
+    coalesced: int
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame: Frame | None = None
+        self._pending = 0
+        self.received = 0
+        self.coalesced = 0
+
+    def put(self, frame: Frame) -> None:
+        with self._lock:
+            self._frame = frame
+            self._pending += 1
+            self.received += 1
+
+    def take(self) -> Frame | None:
+        with self._lock:
+            if self._pending == 0:
+                return None
+            self.coalesced += self._pending - 1
+            self._pending = 0
+            frame, self._frame = self._frame, None
+            return frame
+
+
+class WatchListAcquisition:
+    """
+    Acquires several registers in one thread. Polled registers are read together through a TransferGroup at a fixed
+    rate, updates of push registers are collected from a ReadAnyGroup in between, without blocking. Each cycle hands
+    the frames of all registers updated in it to onFrames, keyed by register path. A push register updated several
+    times within a cycle gets one onFrames call per update, so none of the drained updates is dropped. Push updates
+    are only picked up once per cycle though, and updates exceeding the queue of the accessor in the meantime are lost
+    in DeviceAccess.
+    """
+    hz: float
+
+    def __init__(self, polled: dict[str, da.TransferElementBase], pushed: dict[str, da.TransferElementBase],
+                 hz: float, onFrames: Callable[[dict[str, Frame]], None], onError: Callable[[RuntimeError], None]):
+        self.hz = hz
+        self._polled = polled
+        self._pushed = pushed
+        self._onFrames = onFrames
+        self._onError = onError
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self) -> None:
+        transferGroup = da.TransferGroup()
+        for accessor in self._polled.values():
+            transferGroup.addAccessor(accessor)
+        readAnyGroup = da.ReadAnyGroup()
+        for accessor in self._pushed.values():
+            readAnyGroup.add(accessor)
+        if len(self._pushed) > 0:
+            readAnyGroup.finalise()
+
+        sequence = 0
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            sequence += 1
+            frames: dict[str, Frame] = {}
+            try:
+                if len(self._polled) > 0:
+                    transferGroup.read()
+                    now = datetime.now()
+                    for path, accessor in self._polled.items():
+                        frames[path] = Frame(copy_frame_data(accessor), now, accessor.getVersionNumber(), sequence)
+                while len(self._pushed) > 0:
+                    updated = readAnyGroup.readAnyNonBlocking()
+                    if not updated.isValid():
+                        break
+                    for path, accessor in self._pushed.items():
+                        if accessor.getId() == updated:
+                            if path in frames:
+                                # hand over the earlier update before it is replaced
+                                self._onFrames(frames)
+                                frames = {}
+                            frames[path] = Frame(copy_frame_data(accessor), datetime.now(),
+                                                 accessor.getVersionNumber(), sequence)
+            except RuntimeError as e:
+                self._onError(e)
+                return
+            if len(frames) > 0:
+                self._onFrames(frames)
+
+            deadline += 1 / self.hz
+            now = time.monotonic()
+            if deadline < now:
+                deadline = now
+            self._stop.wait(deadline - now)
+
+
+class LatestFrames:
+    """Like LatestFrame, but keeps the newest frame per register path, so sparse updates are not lost."""
+    received: int
+    coalesced: int
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frames: dict[str, Frame] = {}
+        self.received = 0
+        self.coalesced = 0
+
+    def put(self, frames: dict[str, Frame]) -> None:
+        with self._lock:
+            self.coalesced += len(self._frames.keys() & frames.keys())
+            self.received += len(frames)
+            self._frames.update(frames)
+
+    def take(self) -> dict[str, Frame]:
+        with self._lock:
+            frames, self._frames = self._frames, {}
+            return frames
@@ -5,11 +5,12 @@ if TYPE_CHECKING:
     from MainApp import LayoutApp
 from textual.app import ComposeResult
 from textual.containers import Vertical
-from textual.widgets import Label, Checkbox, RadioSet, RadioButton
+from textual.widgets import Label, Checkbox, RadioSet, RadioButton, Input
 
 from textual import on
 
-import deviceaccess as da
+from chai import Utils
+
 from datetime import datetime
 
 from collections import deque
@@ -27,6 +28,8 @@ class ActionsView(Vertical):
             Checkbox("Read after write",  compact=True, id="checkbox_read_after_write"),
             Checkbox("Autoselect previous register", compact=True, id="checkbox_autoselect"),
             Checkbox("Sort registers", compact=True, id="checkbox_sort_registers"),
+            Checkbox("Acquire pinned registers", compact=True, id="checkbox_watch_list"),
+            Label("", id="label_watch_list"),
 
             Label("Poll frequency", id="label_poll_update_frq"),
             RadioSet(
@@ -38,38 +41,73 @@ class ActionsView(Vertical):
                 id="radio_set_freq"
             ),
 
+            Label("Display refresh rate", id="label_render_frq"),
+            RadioSet(
+                RadioButton("10 fps", value=False, id="radio_fps_10"),
+                RadioButton("20 fps", value=False, id="radio_fps_20"),
+                RadioButton("30 fps", value=True, id="radio_fps_30"),
+                compact=True,
+                id="radio_set_render"
+            ),
+
+            Label("Device open timeout [s]", id="label_open_timeout"),
+            Input(value="10", type="number", id="input_open_timeout", compact=True),
+
+            Label("Devices kept open", id="label_device_pool_size"),
+            Input(value="4", type="integer", id="input_device_pool_size", compact=True),
+
+            Label("History depth [frames]", id="label_history_depth"),
+            Input(value="1000", type="integer", id="input_history_depth", compact=True),
+            Label("History memory [MiB]", id="label_history_memory"),
+            Input(value="256", type="integer", id="input_history_memory", compact=True),
+
+            Label("", id="label_accessor_cache"),
+
         )
 
     def update(self) -> None:
-        self.app.pushMode = self.app.register is not None and    \
-            da.AccessMode.wait_for_new_data in self.app.register.accessor.getAccessModeFlags()
+        cache = self.app.accessorCache
+        self.query_one("#label_accessor_cache", Label).update(
+            f"Accessor cache: {len(cache)}/{cache.maxSize} entries, {cache.hits} hits, {cache.misses} misses")
 
         self.query_one("#label_poll_update_frq", Label).visible = not self.app.pushMode
         self.query_one("#radio_set_freq", RadioSet).visible = not self.app.pushMode
         self.query_one("#radio_set_freq", RadioSet).disabled = True
+        self.updateRadioSetFrqButtons()
 
     def on_mount(self) -> None:
-        self.watch(self.app, "register", lambda register: self.update())
-        self.watch(self.app, "isOpen", lambda open: self.update())
+        Utils.watch_when_shown(self, self.app, "register", lambda register: self.update(), catchUp=self.update)
+        Utils.watch_when_shown(self, self.app, "isOpen", lambda open: self.update(), catchUp=self.update)
 
         self.watch(self.app, "continuousRead", self.updateRadioSetFrqButtons)
+        self.watch(self.app, "watchListActive", self.updateRadioSetFrqButtons)
+        self.watch(self.app, "watchListActive", lambda active: self.updateWatchList())
+        self.watch(self.app, "watchList", lambda watchList: self.updateWatchList())
         self.query_one("#checkbox_sort_registers", Checkbox).value = self.app.sortedRegisters
         self.query_one("#checkbox_autoselect", Checkbox).value = self.app.autoSelectPreviousRegister
+        self.query_one("#input_open_timeout", Input).value = f"{self.app.openTimeout:g}"
+        self.query_one("#input_device_pool_size", Input).value = str(self.app.devicePool.maxSize)
+        self.query_one("#input_history_depth", Input).value = str(self.app.historyDepth)
+        self.query_one("#input_history_memory", Input).value = str(self.app.historyMemory)
         self.update()
 
     def updateRadioSetFrqButtons(self) -> None:
-        if not self.app.pushMode:
-            self.query_one("#radio_set_freq").disabled = not self.app.continuousRead
+        # the poll frequency is used by the watch list as well
+        if not self.app.pushMode or self.app.watchListActive:
+            self.query_one("#label_poll_update_frq", Label).visible = True
+            self.query_one("#radio_set_freq", RadioSet).visible = True
+            self.query_one("#radio_set_freq").disabled = not (self.app.continuousRead or self.app.watchListActive)
 
-    def on_unmount(self):
-        if self.app.pushMode and self.app.register is not None:
-            self.app.register.accessor.interrupt()
+    def updateWatchList(self) -> None:
+        self.query_one("#checkbox_watch_list", Checkbox).value = self.app.watchListActive
+        self.query_one("#label_watch_list", Label).update(f"Pinned registers: {len(self.app.watchList)}")
 
     @on(Checkbox.Changed, "#checkbox_read_after_write")
     def on_read_after_write_changed(self, changed: Checkbox.Changed):
         self.app.readAfterWrite = changed.control.value
 
-    def on_radio_set_changed(self, changed: RadioSet.Changed) -> None:
+    @on(RadioSet.Changed, "#radio_set_freq")
+    def _radio_set_freq_changed(self, changed: RadioSet.Changed) -> None:
         set = self.query_one("#radio_set_freq", RadioSet)
         assert set.pressed_button is not None
         assert set.pressed_button.id is not None
@@ -77,6 +115,48 @@ class ActionsView(Vertical):
         hz = int(set.pressed_button.id[9:])
         self.app.continuousPollHz = hz
 
+    @on(RadioSet.Changed, "#radio_set_render")
+    def _radio_set_render_changed(self, changed: RadioSet.Changed) -> None:
+        set = self.query_one("#radio_set_render", RadioSet)
+        assert set.pressed_button is not None
+        assert set.pressed_button.id is not None
+        assert set.pressed_button.id.startswith("radio_fps_")
+        self.app.renderHz = int(set.pressed_button.id[10:])
+
+    @on(Input.Changed, "#input_open_timeout")
+    def _input_open_timeout_changed(self, changed: Input.Changed) -> None:
+        try:
+            timeout = float(changed.value)
+        except ValueError:
+            return
+        if timeout > 0:
+            self.app.openTimeout = timeout
+
+    @on(Input.Changed, "#input_device_pool_size")
+    def _input_device_pool_size_changed(self, changed: Input.Changed) -> None:
+        try:
+            size = int(changed.value)
+        except ValueError:
+            return
+        if size > 0 and size != self.app.devicePool.maxSize:
+            self.app.setDevicePoolSize(size)
+
+    @on(Input.Changed, "#input_history_depth")
+    @on(Input.Changed, "#input_history_memory")
+    def _input_history_changed(self, changed: Input.Changed) -> None:
+        try:
+            depth = int(self.query_one("#input_history_depth", Input).value)
+            memory = int(self.query_one("#input_history_memory", Input).value)
+        except ValueError:
+            return
+        if depth > 1 and memory > 0 and (depth, memory) != (self.app.historyDepth, self.app.historyMemory):
+            # the history is dropped, buffers are allocated with the new limits
+            self.app.setHistoryLimits(depth, memory)
+
+    @on(Checkbox.Changed, "#checkbox_watch_list")
+    def _checkbox_watch_list_changed(self, changed: Checkbox.Changed) -> None:
+        self.app.watchListActive = changed.control.value
+
     @on(Checkbox.Changed, "#checkbox_sort_registers")
     def _checkbox_sort_changed(self, changed: Checkbox.Changed) -> None:
         self.app.sortedRegisters = changed.control.value
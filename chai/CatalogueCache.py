@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import re
+
+import deviceaccess as da
+
+
+def cache_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "chai", "catalogues")
+
+
+def map_file_of(cdd: str, dmapPath: str | None) -> str | None:
+    """Path of the map file referenced by the CDD, relative paths are resolved like DeviceAccess does."""
+    match = re.search(r"[?&]map=([^&)]+)", cdd)
+    if match is None:
+        return None
+    mapFile = match.group(1).strip()
+    if not os.path.isabs(mapFile) and dmapPath is not None:
+        mapFile = os.path.join(os.path.dirname(os.path.abspath(dmapPath)), mapFile)
+    return mapFile
+
+
+def _map_file_mtime(mapFile: str | None) -> float | None:
+    if mapFile is None:
+        return None
+    try:
+        return os.path.getmtime(mapFile)
+    except OSError:
+        return None
+
+
+def _cache_file(cdd: str, mapFile: str | None) -> str:
+    key = hashlib.sha1(f"{cdd}\n{mapFile}".encode()).hexdigest()
+    return os.path.join(cache_directory(), f"{key}.json")
+
+
+def _describe(info: da.RegisterInfo) -> dict:
+    modes = info.getSupportedAccessModes()
+    dd = info.getDataDescriptor()
+    return {
+        "name": str(info.getRegisterName()),
+        "nElements": info.getNumberOfElements(),
+        "nChannels": info.getNumberOfChannels(),
+        "nDimensions": info.getNumberOfDimensions(),
+        "type": str(dd.fundamentalType()),
+        "readable": info.isReadable(),
+        "writeable": info.isWriteable(),
+        "raw": da.AccessMode.raw in modes,
+        "waitForNewData": da.AccessMode.wait_for_new_data in modes,
+    }
+
+
+def snapshot_catalogue(catalogue: da.RegisterCatalogue) -> list[dict]:
+    """Compact description of all registers shown in the register tree, including the dummy interrupts."""
+    registers = [_describe(info) for info in catalogue]
+    for info in catalogue.hiddenRegisters():
+        if str(info.getRegisterName()).startswith("/DUMMY_INTERRUPT_"):
+            registers.append(_describe(info))
+    return registers
+
+
+def load_snapshot(cdd: str, dmapPath: str | None) -> list[dict] | None:
+    """Cached snapshot for the CDD, or None if there is none or the map file changed since it was stored."""
+    mapFile = map_file_of(cdd, dmapPath)
+    try:
+        with open(_cache_file(cdd, mapFile)) as file:
+            content = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if content.get("cdd") != cdd or content.get("mapFileMtime") != _map_file_mtime(mapFile):
+        return None
+    return content.get("registers")
+
+
+def store_snapshot(cdd: str, dmapPath: str | None, registers: list[dict]) -> None:
+    mapFile = map_file_of(cdd, dmapPath)
+    content = {"cdd": cdd, "mapFile": mapFile, "mapFileMtime": _map_file_mtime(mapFile), "registers": registers}
+    path = _cache_file(cdd, mapFile)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, so concurrent Chai instances never read a partial file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(content, file, separators=(",", ":"))
+        os.replace(temporary, path)
+    except OSError:
+        # the cache is an optimisation only
+        pass
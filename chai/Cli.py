@@ -0,0 +1,253 @@
+"""
+Non-interactive read and write of registers, e.g. for scripts. This module must not import Textual (directly or
+through the views), so the command line stays fast to start. Only run_interactive() imports it, when no register is
+read or written.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import deviceaccess as da
+
+from chai import Accessors
+from chai.Accessors import AccessorHolder
+from chai.Conversion import RawConverter
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chai", description="Console Hardware Interface. Without --device the interactive interface is started, "
+        "optionally with a dmap file to load.")
+    parser.add_argument("--dmap", help="dmap file defining the device aliases")
+    parser.add_argument("--device", help="alias or CDD of the device")
+    parser.add_argument("--read", metavar="REGISTER", dest="operations", action="append", default=[],
+                        type=lambda path: ("read", path), help="read a register, can be given multiple times")
+    parser.add_argument("--write", metavar="REGISTER=VALUES", dest="operations", action="append",
+                        type=lambda assignment: ("write", assignment),
+                        help="write comma separated values to a register, channels are separated by ';'. Elements "
+                        "not given keep their current value.")
+    parser.add_argument("--follow", metavar="REGISTER", action="append", default=[],
+                        help="write every update of the register until interrupted, can be given multiple times")
+    parser.add_argument("--rate", type=float, default=10., help="poll rate in Hz for --follow (default 10)")
+    parser.add_argument("--count", type=int, help="stop following after this number of updates")
+    parser.add_argument("--raw", action="store_true", help="follow raw instead of cooked values")
+    parser.add_argument("--format", choices=["json", "text", "binary"], default="json",
+                        help="one JSON object per register and line (default), tab separated text, or length-prefixed "
+                        "binary frames (--follow only)")
+    return parser
+
+
+class RegisterIO:
+    """Cooked access to one register through the accessor setup of the interactive interface."""
+    register: AccessorHolder
+
+    def __init__(self, register: AccessorHolder):
+        self.register = register
+        self._converter: RawConverter | None = None
+        if da.AccessMode.raw in register.flags:
+            self._converter = RawConverter(register.accessor, register.info)
+
+    def read(self) -> list[list]:
+        accessor = self.register.accessor
+        accessor.readLatest()
+        if not isinstance(accessor, da.TwoDRegisterAccessor):
+            return []
+        if self._converter is None:
+            return np.asarray(accessor.get()).tolist()
+        elements = np.arange(self.register.info.getNumberOfElements())
+        return [self._converter.cooked(channel, elements).tolist()
+                for channel in range(self.register.info.getNumberOfChannels())]
+
+    def write(self, values: list[list[str]]) -> None:
+        accessor = self.register.accessor
+        info = self.register.info
+        if isinstance(accessor, da.TwoDRegisterAccessor):
+            if len(values) > info.getNumberOfChannels() or \
+                    any(len(channel) > info.getNumberOfElements() for channel in values):
+                raise ValueError(f"Register has {info.getNumberOfChannels()} channel(s) with "
+                                 f"{info.getNumberOfElements()} element(s) each.")
+            complete = len(values) == info.getNumberOfChannels() and \
+                all(len(channel) == info.getNumberOfElements() for channel in values)
+            if not complete and info.isReadable():
+                accessor.readLatest()
+            for channel, channelValues in enumerate(values):
+                for element, value in enumerate(channelValues):
+                    if self._converter is None:
+                        accessor[channel][element] = parse_value(value, self.register.npType)
+                    else:
+                        accessor.setAsCooked(channel, element, parse_value(value, float))
+
+        if self.register.dummyWriteAccessor is None:
+            accessor.write()
+        else:
+            if isinstance(accessor, da.TwoDRegisterAccessor):
+                self.register.dummyWriteAccessor.set(accessor.get())
+            self.register.dummyWriteAccessor.write()
+
+
+def parse_value(value: str, npType) -> int | float | str | bool:
+    value = value.strip()
+    if npType is str:
+        return value
+    if npType is bool:
+        return value.lower() in ["1", "true", "yes", "on"]
+    try:
+        # also accepts hex and binary literals
+        return int(value, 0)
+    except ValueError:
+        return float(value)
+
+
+def parse_values(values: str) -> list[list[str]]:
+    if values == "":
+        return []
+    return [channel.split(",") for channel in values.split(";")]
+
+
+def shape_value(value: list[list]):
+    """Drop the channel dimension of single-channel registers, and the element dimension of scalars."""
+    if len(value) != 1:
+        return value
+    if len(value[0]) != 1:
+        return value[0]
+    return value[0][0]
+
+
+def to_json(result: dict) -> str:
+    """JSON of a result, with NaN and infinities written as null since JSON cannot represent them."""
+    try:
+        return json.dumps(result, allow_nan=False)
+    except ValueError:
+        return json.dumps(_finite(result), allow_nan=False)
+
+
+def _finite(value):
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    return value
+
+
+def format_result(result: dict, outputFormat: str) -> str:
+    if outputFormat == "json":
+        return to_json(result)
+    if "error" in result:
+        return f"{result['register']}\terror\t{result['error']}"
+    if "value" not in result:
+        return f"{result['register']}\tok"
+    value = result["value"]
+    if not isinstance(value, list):
+        value = [value]
+    if len(value) > 0 and isinstance(value[0], list):
+        return "\n".join(f"{result['register']}[{channel}]\t" + "\t".join(map(str, values))
+                         for channel, values in enumerate(value))
+    return f"{result['register']}\t" + "\t".join(map(str, value))
+
+
+def run(operations: list[tuple[str, str]], device: da.Device, catalogue: da.RegisterCatalogue,
+        outputFormat: str) -> int:
+    registers: dict[str, RegisterIO] = {}
+
+    def registerIO(path: str) -> RegisterIO:
+        if path not in registers:
+            register = Accessors.create_accessor_holder(device, catalogue, path)
+            registers[path] = RegisterIO(register)
+        return registers[path]
+
+    failed = False
+    for operation, argument in operations:
+        if operation == "read":
+            path = argument
+        else:
+            path, _, values = argument.partition("=")
+        path = path.strip()
+        result: dict = {"register": path}
+        try:
+            io = registerIO(path)
+            if operation == "read":
+                result["value"] = shape_value(io.read())
+                result["timestamp"] = datetime.now().isoformat()
+            else:
+                io.write(parse_values(values))
+                result["written"] = True
+        except (RuntimeError, ValueError) as e:
+            result["error"] = str(e)
+            failed = True
+        print(format_result(result, outputFormat), flush=True)
+    return 1 if failed else 0
+
+
+def run_interactive(parser: argparse.ArgumentParser, dmapPath: str | None) -> int:
+    if dmapPath is not None and not os.path.exists(dmapPath):
+        parser.error(f'File "{dmapPath}" does not exist')
+    # the only place the command line imports Textual
+    from chai.MainApp import LayoutApp
+    LayoutApp(initialPath=dmapPath).run()
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.device is None and len(args.operations) == 0 and len(args.follow) == 0:
+        return run_interactive(parser, args.dmap)
+    if args.device is None:
+        parser.error("--device is required for reading and writing registers")
+    if len(args.operations) == 0 and len(args.follow) == 0:
+        parser.error("nothing to do, use --read, --write or --follow")
+    if len(args.operations) > 0 and len(args.follow) > 0:
+        parser.error("--follow cannot be combined with --read or --write")
+    if args.format == "binary" and len(args.follow) == 0:
+        parser.error("the binary format is only available with --follow")
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    try:
+        if args.dmap is not None:
+            da.setDMapFilePath(args.dmap)
+        device = da.Device(args.device)
+        device.open()
+        catalogue = device.getRegisterCatalogue()
+        paths = [argument.partition("=")[0].strip() for _, argument in args.operations] + args.follow
+        if any(catalogue.hasRegister(path) and Accessors.needs_async_read(catalogue.getRegister(path))
+               for path in paths):
+            device.activateAsyncRead()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        if len(args.follow) > 0:
+            return follow(args, device, catalogue)
+        return run(args.operations, device, catalogue, args.format)
+    finally:
+        device.close()
+
+
+def follow(args: argparse.Namespace, device: da.Device, catalogue: da.RegisterCatalogue) -> int:
+    # imported here, the module is not needed for single reads and writes
+    from chai import Stream
+
+    try:
+        follower = Stream.Follower(device, catalogue, args.follow, args.rate, Stream.create_writer(args.format),
+                                   raw=args.raw, count=args.count)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    follower.run()
+
+    if isinstance(follower.error, (BrokenPipeError, ValueError)):
+        # stdout has been closed by the consumer, keep Python from complaining about it at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    if follower.error is not None:
+        print(f"Error: {follower.error}", file=sys.stderr)
+        return 1
+    return 0
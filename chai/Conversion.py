@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+import deviceaccess as da
+
+
+class RawConverter:
+    """
+    Vectorised conversion of raw register content into cooked values and hex strings.
+
+    The fixed point parameters (width, fractional bits, signedness) are not part of the RegisterInfo, so they are
+    determined once by probing getAsCooked() with single bit patterns. If the probed conversion cannot be reproduced
+    exactly, cooked values fall back to per-element getAsCooked() calls.
+
+    Probing temporarily writes into the buffer of probeAccessor. If the accessor is read or shown concurrently, pass
+    a separate accessor to the same register, e.g. from AccessorHolder.createReadAccessor().
+    """
+    isVectorised: bool
+
+    def __init__(self, accessor: da.TwoDRegisterAccessor, info: da.RegisterInfo,
+                 probeAccessor: da.TwoDRegisterAccessor | None = None):
+        self._accessor = accessor
+        self._probeAccessor = probeAccessor if probeAccessor is not None else accessor
+        self._rawType = np.dtype(accessor.getValueType())
+        self._rawBits = self._rawType.itemsize * 8
+        self._rawMask = (1 << self._rawBits) - 1
+        self._unsignedType = np.dtype(f"u{self._rawType.itemsize}")
+        self._integral = info.getDataDescriptor().isIntegral()
+        self._ieee754 = False
+        self._width = self._rawBits
+        self._signed = False
+        self._fractionalBits = 0
+        self._nChannels = info.getNumberOfChannels()
+        self._nElements = info.getNumberOfElements()
+        self.isVectorised = False
+
+        if not np.issubdtype(self._rawType, np.integer) or self._rawBits > 32 or info.getNumberOfElements() == 0:
+            return
+        self.isVectorised = self._probe()
+
+    def _cookedFromRawPattern(self, pattern: int) -> float:
+        buffer = self._probeAccessor[0]
+        saved = buffer[0]
+        buffer[0] = np.array(pattern, dtype=np.uint64).astype(self._rawType)
+        try:
+            return float(self._probeAccessor.getAsCooked(0, 0))
+        finally:
+            buffer[0] = saved
+
+    def _probe(self) -> bool:
+        if self._rawBits == 32 and self._cookedFromRawPattern(0x3F800000) == 1.0:
+            self._ieee754 = True
+        else:
+            bits = [self._cookedFromRawPattern(1 << bit) for bit in range(self._rawBits)]
+            usedBits = [bit for bit, cooked in enumerate(bits) if cooked != 0]
+            if len(usedBits) == 0:
+                return False
+            self._width = usedBits[-1] + 1
+            self._signed = bits[self._width - 1] < 0
+            fractionalBits = -math.log2(abs(bits[0])) if bits[0] != 0 else math.nan
+            if not math.isfinite(fractionalBits) or fractionalBits != round(fractionalBits):
+                return False
+            self._fractionalBits = int(fractionalBits)
+
+        # verify the derived conversion against the device's own for some patterns, including negative values
+        patterns = [0, 1, self._rawMask, self._rawMask >> 1, 0x5A5A5A5A & self._rawMask, 0xA5A5A5A5 & self._rawMask]
+        raw = np.array(patterns, dtype=np.uint64).astype(self._rawType)
+        expected = np.array([self._cookedFromRawPattern(pattern) for pattern in patterns])
+        return bool(np.array_equal(expected, self._toCooked(raw), equal_nan=True))
+
+    def _toCooked(self, raw: np.ndarray) -> np.ndarray:
+        if self._ieee754:
+            return np.ascontiguousarray(raw).view(np.float32).astype(np.float64)
+        values = raw.astype(np.int64) & ((1 << self._width) - 1)
+        if self._signed:
+            values = np.where(values & (1 << (self._width - 1)), values - (1 << self._width), values)
+        if self._fractionalBits == 0 and self._integral:
+            return values
+        return values * 2.0 ** -self._fractionalBits
+
+    def cooked(self, channel: int, elements: np.ndarray) -> np.ndarray:
+        if not self.isVectorised:
+            return np.array([self._accessor.getAsCooked(channel, int(element)) for element in elements])
+        return self._toCooked(np.asarray(self._accessor[channel])[elements])
+
+    def cookedFrame(self, raw: np.ndarray) -> np.ndarray:
+        """Cooked values of all channels. raw must be the current content of the accessor, which is used if the
+        conversion is not vectorised."""
+        if self.isVectorised:
+            return self._toCooked(raw)
+        elements = np.arange(self._nElements)
+        return np.array([self.cooked(channel, elements) for channel in range(self._nChannels)])
+
+    def cookedValues(self, raw: np.ndarray) -> np.ndarray:
+        """Cooked values of raw values of any shape, e.g. the history of one element. Without a vectorised
+        conversion the raw values are returned, the accessor can only convert its current content."""
+        if not self.isVectorised:
+            return raw
+        return self._toCooked(raw)
+
+    def hex(self, raw: np.ndarray) -> list[str]:
+        # negative values are shown as their two's complement. Mapping hex() over a list is considerably faster than
+        # np.char.mod().
+        return list(map(hex, np.ascontiguousarray(raw).view(self._unsignedType).tolist()))
+
+    def cells(self, channel: int, elements: np.ndarray) -> list[tuple[float | int, int, str]]:
+        """(cooked, raw, raw hex) table cells for the given elements of a channel."""
+        raw = np.asarray(self._accessor[channel])[elements]
+        return list(zip(self.cooked(channel, elements).tolist(), raw.tolist(), self.hex(raw)))
@@ -0,0 +1,177 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from MainApp import LayoutApp
+from textual.app import ComposeResult
+from textual.containers import Vertical, Horizontal, VerticalScroll
+from textual.widgets import Label, Checkbox, Sparkline
+
+from textual import on
+
+from chai.Acquisition import Frame
+from chai.Conversion import RawConverter
+from chai.Accessors import AccessorHolder
+from chai import Utils
+
+import deviceaccess as da
+import numpy as np
+
+from datetime import datetime
+
+
+class PinnedRegister(Horizontal):
+    """One row of the dashboard: path, value, age of the last update and a sparkline of the first element."""
+    if TYPE_CHECKING:
+        app: LayoutApp
+
+    path: str
+    maxShownElements: int = 8
+    historyLength: int = 60
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._register: AccessorHolder | None = None
+        self._buffer: da.TransferElementBase | None = None
+        self._converter: RawConverter | None = None
+        self._lastUpdate: datetime | None = None
+        self._shownValue = ""
+        self._shownAge = ""
+
+    def compose(self) -> ComposeResult:
+        yield Label(self.path, classes="pinned_path")
+        yield Label("(no data)", classes="pinned_value")
+        yield Label("", classes="pinned_age")
+        yield Sparkline([], summary_function=max, classes="pinned_sparkline")
+
+    def on_mount(self) -> None:
+        frame = self.app.watchValues.get(self.path)
+        if frame is not None:
+            self.showFrame(frame)
+
+    def _setupConversion(self, register: AccessorHolder) -> None:
+        self._register = register
+        self._buffer = None
+        self._converter = None
+        if da.AccessMode.raw in register.flags and self.app.currentDevice is not None:
+            # frames contain raw values. They are converted in a separate accessor which is never transferred.
+            self._buffer = register.createReadAccessor(self.app.currentDevice)
+            self._converter = RawConverter(self._buffer, register.info)
+
+    def _values(self, frame: Frame) -> np.ndarray:
+        assert frame.data is not None
+        shown = min(frame.data.shape[1], self.maxShownElements)
+        if self._converter is None or self._buffer is None:
+            return frame.data[0, :shown]
+        self._buffer.set(frame.data)
+        return self._converter.cooked(0, np.arange(shown))
+
+    def showFrame(self, frame: Frame) -> None:
+        register = self.app.watchRegisters.get(self.path)
+        if register is not None and register is not self._register:
+            self._setupConversion(register)
+        self._lastUpdate = frame.timestamp
+
+        if frame.data is None:
+            text = "(void)"
+        else:
+            values = self._values(frame)
+            text = ", ".join(f"{value:.6g}" if isinstance(value, float) else str(value) for value in values.tolist())
+            if frame.data.shape[1] > len(values):
+                text += f", … ({frame.data.shape[1]} elements)"
+            if frame.data.shape[0] > 1:
+                text = f"[ch 0 of {frame.data.shape[0]}] {text}"
+            self._updateSparkline()
+
+        # only touch widgets whose content actually changed, each update causes a repaint of the widget
+        if text != self._shownValue:
+            self._shownValue = text
+            self.query_one(".pinned_value", Label).update(text)
+        self.updateAge(datetime.now())
+
+    def _updateSparkline(self) -> None:
+        history = self.app.historyStore.get(self.app.historyKey(self.path))
+        if history is None or len(history) == 0:
+            return
+        values = history.series(0, 0, self.historyLength)
+        if self._converter is not None:
+            values = self._converter.cookedValues(values)
+        self.query_one(".pinned_sparkline", Sparkline).data = values.tolist()
+
+    def updateAge(self, now: datetime) -> None:
+        if self._lastUpdate is None:
+            return
+        age = (now - self._lastUpdate).total_seconds()
+        text = "now" if age < 1 else f"{age:.0f} s ago"
+        if text != self._shownAge:
+            self._shownAge = text
+            self.query_one(".pinned_age", Label).update(text)
+
+
+class DashboardView(Vertical):
+    """Overview of all pinned registers. Only rows of registers which got a new frame are updated."""
+    if TYPE_CHECKING:
+        app: LayoutApp
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rows: dict[str, PinnedRegister] = {}
+
+    def compose(self) -> ComposeResult:
+        self.add_class("main_col")
+
+        yield Horizontal(
+            Label("Pinned registers", id="label_dashboard"),
+            Checkbox("Acquire", compact=True, id="checkbox_dashboard_acquire"),
+            classes="small_row"
+        )
+        yield Label("No registers pinned. Use the Pin button on the register screen.", id="label_dashboard_empty")
+        yield VerticalScroll(id="dashboard_registers")
+
+    def on_mount(self) -> None:
+        self.watch(self.app, "watchList", lambda watchList: self.updateRows())
+        # while hidden, rows are not updated. They are all brought up to date once the dashboard is shown.
+        Utils.watch_when_shown(self, self.app, "watchValuesChanged", lambda changed: self.on_watchValuesChanged(),
+                               catchUp=self.showAllValues)
+        self.watch(self.app, "watchListActive", lambda active: self.on_watchListActiveChanged(active))
+        self.set_interval(1, self._updateAges)
+
+    def updateRows(self) -> None:
+        """Add and remove rows for changes of the watch list, existing rows are kept."""
+        watchList = self.app.watchList
+        container = self.query_one("#dashboard_registers", VerticalScroll)
+        for path in [path for path in self._rows if path not in watchList]:
+            self._rows.pop(path).remove()
+        for path in watchList:
+            if path not in self._rows:
+                row = PinnedRegister(path)
+                self._rows[path] = row
+                container.mount(row)
+        self.query_one("#label_dashboard_empty", Label).display = len(watchList) == 0
+
+    def on_watchValuesChanged(self) -> None:
+        for path in self.app.watchUpdated:
+            row = self._rows.get(path)
+            if row is not None and row.is_mounted:
+                row.showFrame(self.app.watchValues[path])
+
+    def showAllValues(self) -> None:
+        for path, row in self._rows.items():
+            frame = self.app.watchValues.get(path)
+            if frame is not None and row.is_mounted:
+                row.showFrame(frame)
+
+    def on_watchListActiveChanged(self, active: bool) -> None:
+        self.query_one("#checkbox_dashboard_acquire", Checkbox).value = active
+
+    def _updateAges(self) -> None:
+        if not self.screen.is_current:
+            return
+        now = datetime.now()
+        for row in self._rows.values():
+            if row.is_mounted:
+                row.updateAge(now)
+
+    @on(Checkbox.Changed, "#checkbox_dashboard_acquire")
+    def _checkbox_acquire_changed(self, changed: Checkbox.Changed) -> None:
+        self.app.watchListActive = changed.control.value
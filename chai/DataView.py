@@ -7,23 +7,33 @@ from textual.screen import ModalScreen
 from textual.containers import Horizontal, Vertical, Container, Grid
 from textual.widgets import Button, Label, Static, Input, Button, DataTable, Input
 from textual.containers import ScrollableContainer
+from textual.scroll_view import ScrollView
 from textual.validation import Number
 from textual.coordinate import Coordinate
+from textual.geometry import Region, Size, Spacing
+from textual.binding import Binding
+from textual.reactive import Reactive
+from textual.message import Message
+from textual.strip import Strip
+from rich.segment import Segment
+from collections.abc import Callable
 
-from textual import on, events, log
+from textual import on, events
 
 from chai import Utils
+from chai import Profiling
+from chai.Conversion import RawConverter
 
 import deviceaccess as da
-from chai.Utils import AccessorHolder
-from numpy import dtype
+from chai.Accessors import AccessorHolder
+import numpy as np
 
 
 class EditValueScreen(ModalScreen):
-    table: DataTable
+    table: "DataTable | VirtualContentTable"
     first_submit: bool
 
-    def __init__(self, owner, table: DataTable):
+    def __init__(self, owner, table: "DataTable | VirtualContentTable"):
         super().__init__()
         self.table = table
         self.first_submit = True
@@ -80,31 +90,241 @@ class ContentTable(DataTable):
             self.app.push_screen(EditValueScreen(self.parent, self))
 
 
+class VirtualContentTable(ScrollView, can_focus=True):
+    """
+    Table for registers too large to be materialised into a DataTable. Only the visible rows (plus a small margin) are
+    formatted, their cells are requested block-wise from cellsFunction(start, stop), which reads straight from the
+    accessor buffer. invalidate() drops the formatted rows after new values have arrived. Provides the part of the
+    DataTable interface used by EditValueScreen and RegisterValueField.cellEditDone.
+    """
+
+    BINDINGS = [
+        Binding("up", "cursor_up", show=False),
+        Binding("down", "cursor_down", show=False),
+        Binding("left", "cursor_left", show=False),
+        Binding("right", "cursor_right", show=False),
+        Binding("pageup", "page_up", show=False),
+        Binding("pagedown", "page_down", show=False),
+        Binding("home", "cursor_top", show=False),
+        Binding("end", "cursor_bottom", show=False),
+    ]
+
+    COMPONENT_CLASSES = {"virtual-table--header", "virtual-table--label", "virtual-table--cursor"}
+
+    DEFAULT_CSS = """
+    VirtualContentTable {
+        background: $surface;
+        color: $foreground;
+        height: auto;
+        max-height: 100%;
+        & > .virtual-table--header {
+            text-style: bold;
+            background: $panel;
+        }
+        & > .virtual-table--label {
+            background: $secondary-muted;
+        }
+        & > .virtual-table--cursor {
+            background: $block-cursor-blurred-background;
+            color: $block-cursor-blurred-foreground;
+        }
+        &:focus > .virtual-table--cursor {
+            background: $block-cursor-background;
+            color: $block-cursor-foreground;
+            text-style: $block-cursor-text-style;
+        }
+    }
+    """
+
+    cursor_coordinate: Reactive[Coordinate] = Reactive(Coordinate(0, 0))
+
+    class CursorMoved(Message):
+        """Counterpart of DataTable.CellHighlighted."""
+
+    _labelWidth: int = 0
+    _rowCount: int = 0
+    _cacheStart: int = 0
+
+    # rows formatted in addition to the visible ones, so scrolling by a few lines does not need new cells
+    margin: int = 20
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._columns: list[str] = []
+        self._widths: list[int] = []
+        self._cellsFunction: Callable[[int, int], list[tuple]] = lambda start, stop: []
+        self._cache: list[tuple] = []
+
+    def setup(self, columns: list[str], rowCount: int, cellsFunction: Callable[[int, int], list[tuple]]) -> None:
+        self._columns = columns
+        self._widths = [len(column) for column in columns]
+        self._labelWidth = len(str(max(rowCount - 1, 0)))
+        self._rowCount = rowCount
+        self._cellsFunction = cellsFunction
+        self._cache = []
+        self._updateVirtualSize()
+        self.cursor_coordinate = Coordinate(0, 0)
+        self.scroll_to(0, 0, animate=False)
+        self.refresh()
+
+    def _updateVirtualSize(self) -> None:
+        # one line for the header
+        self.virtual_size = Size(self._labelWidth + 2 + sum(width + 2 for width in self._widths), self._rowCount + 1)
+
+    def render_line(self, y: int) -> Strip:
+        scrollX, scrollY = self.scroll_offset
+        if y == 0:
+            header = self.get_component_rich_style("virtual-table--header")
+            segments = [Segment(" " * (self._labelWidth + 2), header)]
+            segments += [Segment(f" {column:<{width}} ", header) for column, width in zip(self._columns, self._widths)]
+            return Strip(segments).crop_extend(scrollX, scrollX + self.size.width, self.rich_style)
+
+        row = scrollY + y - 1
+        if row >= self._rowCount:
+            return Strip.blank(self.size.width, self.rich_style)
+
+        cells = [str(cell) for cell in self._rowCells(row)]
+        widths = [max(width, len(cell)) for width, cell in zip(self._widths, cells)]
+        if widths != self._widths:
+            # columns only grow, so the layout does not jump back and forth while scrolling
+            self._widths = widths
+            self.call_later(self._updateVirtualSize)
+            self.call_later(self.refresh)
+
+        cursorStyle = self.get_component_rich_style("virtual-table--cursor")
+        segments = [Segment(f" {row:>{self._labelWidth}} ", self.get_component_rich_style("virtual-table--label"))]
+        for column, (cell, width) in enumerate(zip(cells, widths)):
+            isCursor = self.cursor_coordinate.row == row and self.cursor_coordinate.column == column
+            segments.append(Segment(f" {cell:<{width}} ", cursorStyle if isCursor else self.rich_style))
+        return Strip(segments).crop_extend(scrollX, scrollX + self.size.width, self.rich_style)
+
+    def _rowCells(self, row: int) -> tuple:
+        if not self._cacheStart <= row < self._cacheStart + len(self._cache):
+            self._cacheStart = max(row - self.margin, 0)
+            self._cache = self._cellsFunction(self._cacheStart,
+                                              min(row + self.size.height + self.margin, self._rowCount))
+        return self._cache[row - self._cacheStart]
+
+    def invalidate(self) -> None:
+        self._cache = []
+        self.refresh()
+
+    def get_cell_at(self, coordinate: Coordinate):
+        return self._rowCells(coordinate.row)[coordinate.column]
+
+    def update_cell_at(self, coordinate: Coordinate, value, update_width: bool = False) -> None:
+        # values are always read from the buffer, it is sufficient to redraw
+        self.invalidate()
+
+    def watch_cursor_coordinate(self, coordinate: Coordinate) -> None:
+        if self._rowCount == 0:
+            return
+        x = self._labelWidth + 2 + sum(width + 2 for width in self._widths[:coordinate.column])
+        region = Region(x, coordinate.row + 1, self._widths[coordinate.column] + 2, 1)
+        self.scroll_to_region(region, animate=False, spacing=Spacing(1, 0, 0, self._labelWidth + 2), force=True)
+        self.refresh()
+        self.post_message(self.CursorMoved())
+
+    def _moveCursor(self, rows: int, columns: int) -> None:
+        if self._rowCount == 0:
+            return
+        row = min(max(self.cursor_coordinate.row + rows, 0), self._rowCount - 1)
+        column = min(max(self.cursor_coordinate.column + columns, 0), len(self._columns) - 1)
+        self.cursor_coordinate = Coordinate(row, column)
+
+    def action_cursor_up(self) -> None:
+        self._moveCursor(-1, 0)
+
+    def action_cursor_down(self) -> None:
+        self._moveCursor(1, 0)
+
+    def action_cursor_left(self) -> None:
+        self._moveCursor(0, -1)
+
+    def action_cursor_right(self) -> None:
+        self._moveCursor(0, 1)
+
+    def action_page_up(self) -> None:
+        self._moveCursor(-(self.size.height - 1), 0)
+
+    def action_page_down(self) -> None:
+        self._moveCursor(self.size.height - 1, 0)
+
+    def action_cursor_top(self) -> None:
+        self._moveCursor(-self._rowCount, 0)
+
+    def action_cursor_bottom(self) -> None:
+        self._moveCursor(self._rowCount, 0)
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None or offset.y == 0 or self._rowCount == 0:
+            return
+        row = int(self.scroll_y) + offset.y - 1
+        if row >= self._rowCount:
+            return
+        x = int(self.scroll_x) + offset.x - (self._labelWidth + 2)
+        column = 0
+        while column < len(self._widths) - 1 and x >= self._widths[column] + 2:
+            x -= self._widths[column] + 2
+            column += 1
+        self.cursor_coordinate = Coordinate(row, column)
+        if event.button == 1 and event.chain >= 2:
+            self.app.push_screen(EditValueScreen(self.parent, self))
+
+
 class RegisterValueField(ScrollableContainer):
 
     if TYPE_CHECKING:
         app: LayoutApp
 
+    # registers with more elements are shown in the VirtualContentTable
+    virtualTableThreshold: int = 10000
+
+    # what the table currently shows, to update only changed cells on new values
+    _tableRegister: AccessorHolder | None = None
+    _tableChannel: int = -1
+    _shownValues: np.ndarray | None = None
+    _converter: RawConverter | None = None
+
     def compose(self) -> ComposeResult:
         table = ContentTable()
         table.add_columns('Value', 'Raw (dec)', 'Raw (hex)')
         yield table
+        virtualTable = VirtualContentTable()
+        virtualTable.display = False
+        yield virtualTable
+
+    def _activeTable(self) -> ContentTable | VirtualContentTable:
+        virtualTable = self.query_one(VirtualContentTable)
+        if virtualTable.display:
+            return virtualTable
+        return self.query_one(ContentTable)
 
     def on_mount(self):
-        self.watch(self.app, "registerValueChanged", lambda x: self.update())
-        self.watch(self.app, "channel", lambda x: self.update())
-        self.watch(self.app, "register", lambda x: self.update())
+        Utils.watch_when_shown(self, self.app, "registerValueChanged", lambda x: self.update(), catchUp=self.update)
+        Utils.watch_when_shown(self, self.app, "channel", lambda x: self.update(), catchUp=self.update)
+        Utils.watch_when_shown(self, self.app, "register", lambda x: self.update(), catchUp=self.update)
 
     def on_key(self, event: events.Key) -> None:
         if event.key != 'enter':
             return
-        table = self.query_one(ContentTable)
+        table = self._activeTable()
         if not table:
             return
         self.app.push_screen(EditValueScreen(self, table))
 
+    @property
+    def converter(self) -> RawConverter | None:
+        """Conversion of the raw values shown, None if the register is not raw."""
+        return self._converter
+
+    def currentElement(self) -> int:
+        """Element under the cursor."""
+        return self._activeTable().cursor_coordinate.row
+
     def currentlySelectedValue(self):
-        table = self.query_one(ContentTable)
+        table = self._activeTable()
         if not table:
             return 0
         if table.cursor_coordinate is None:
@@ -119,7 +339,7 @@ class RegisterValueField(ScrollableContainer):
             return 0
 
     def cellEditDone(self, value) -> None:
-        table = self.query_one(ContentTable)
+        table = self._activeTable()
         row = table.cursor_coordinate.row
 
         if self.app.register is None or not isinstance(self.app.register.accessor, da.TwoDRegisterAccessor):
@@ -133,32 +353,45 @@ class RegisterValueField(ScrollableContainer):
                 self.app.register.accessor[self.app.channel][row] = int(value)
             elif table.cursor_coordinate.column == 2:  # "Raw (hex)"
                 self.app.register.accessor[self.app.channel][row] = int(value, 16)
-
-            table.update_cell_at(
-                coordinate=Coordinate(row, 0), value=self.app.register.accessor.getAsCooked(
-                    # str, # what is that string for?
-                    self.app.channel, row), update_width=True)
-            valueType: dtype = self.app.register.accessor.getValueType()
-            table.update_cell_at(coordinate=Coordinate(row, 1), value=str(
-                self.app.register.accessor[self.app.channel][row]), update_width=True)
-            convertedHex = self.signed_to_unsigned_hex(
-                self.app.register.accessor[self.app.channel][row], valueType.itemsize*8)
-            table.update_cell_at(coordinate=Coordinate(row, 2), value=convertedHex, update_width=True)
-
         else:
             self.app.register.accessor[self.app.channel][row] = int(value)
-            table.update_cell_at(coordinate=Coordinate(row, 0), value=str(
-                self.app.register.accessor[self.app.channel][row]), update_width=True)
 
-    def signed_to_unsigned_hex(self, value: int, bits=32) -> str:
-        # Mask the value to the specified number of bits
-        mask = (1 << bits) - 1
-        unsigned_value = value & mask
-        return hex(unsigned_value)
+        for column, cell in enumerate(self._cells(np.array([row]))[0]):
+            table.update_cell_at(coordinate=Coordinate(row, column), value=cell, update_width=True)
+        if self._shownValues is not None:
+            self._shownValues[row] = self.app.register.accessor[self.app.channel][row]
 
+    @Profiling.timed("RegisterValueField.update")
     def update(self) -> None:
         table = self.query_one(ContentTable)
+        register = self.app.register
+        if register is not self._tableRegister or self.app.channel != self._tableChannel:
+            self._rebuild(table)
+            return
+        if self.query_one(VirtualContentTable).display:
+            # only the visible rows are rendered, straight from the accessor buffer
+            self.query_one(VirtualContentTable).invalidate()
+            return
+        if self._shownValues is None:
+            return
+
+        # only touch the cells whose values changed since the last update
+        values = np.array(register.accessor[self.app.channel], copy=True)
+        changed = np.flatnonzero(values != self._shownValues)
+        for element, cells in zip(changed, self._cells(changed)):
+            for column, cell in enumerate(cells):
+                table.update_cell_at(Coordinate(int(element), column), cell, update_width=True)
+        self._shownValues = values
+
+    def _rebuild(self, table: ContentTable) -> None:
         table.clear(True)
+        self._tableRegister = self.app.register
+        self._tableChannel = self.app.channel
+        self._shownValues = None
+        self._converter = None
+        virtualTable = self.query_one(VirtualContentTable)
+        virtualTable.display = False
+        table.display = True
 
         if self.app.register is None:
             return
@@ -170,22 +403,33 @@ class RegisterValueField(ScrollableContainer):
         if not isinstance(self.app.register.accessor, da.TwoDRegisterAccessor):
             return
 
+        if self.app._isRaw:
+            # the displayed accessor may be read in a worker meanwhile, so the conversion is probed on another one
+            self._converter = RawConverter(self.app.register.accessor, self.app.register.info,
+                                           self.app.register.createReadAccessor(self.app.currentDevice))
+
+        if self.app.register.info.getNumberOfElements() > self.virtualTableThreshold:
+            virtualTable.setup(['Value', 'Raw (dec)', 'Raw (hex)'] if self.app._isRaw else ['Value'],
+                               self.app.register.info.getNumberOfElements(),
+                               lambda start, stop: self._cells(np.arange(start, stop)))
+            table.display = False
+            virtualTable.display = True
+            return
+
         if self.app._isRaw:
             table.add_columns('Value', 'Raw (dec)', 'Raw (hex)')
-            for element, value in enumerate(self.app.register.accessor[self.app.channel]):
-                table.add_row(
-                    self.app.register.accessor.getAsCooked(
-                        # str, # where is that from?
-                        self.app.channel,
-                        element),
-                    value,
-                    hex(value),
-                    label=str(element))
-                log(f"Row {element}: cooked {self.app.register.accessor.getAsCooked(self.app.channel, element)}, raw {value} (0x{hex(value)})")
         else:
             table.add_columns('Value')
-            for element, value in enumerate(self.app.register.accessor[self.app.channel]):
-                table.add_row(value, label=str(element))
+        values = np.array(self.app.register.accessor[self.app.channel], copy=True)
+        for element, cells in enumerate(self._cells(np.arange(len(values)))):
+            table.add_row(*cells, label=str(element))
+        self._shownValues = values
+
+    def _cells(self, elements: np.ndarray) -> list[tuple]:
+        assert self.app.register is not None
+        if self._converter is not None:
+            return self._converter.cells(self.app.channel, elements)
+        return [(value,) for value in np.asarray(self.app.register.accessor[self.app.channel])[elements].tolist()]
 
 
 class RegisterInfo(Vertical):
@@ -229,7 +473,7 @@ class RegisterInfo(Vertical):
             classes="info_box")
 
     def on_mount(self):
-        self.watch(self.app, "register", lambda register: self.on_regster_info_changed(register))
+        Utils.watch_when_shown(self, self.app, "register", lambda register: self.on_regster_info_changed(register))
 
     def on_regster_info_changed(self, register: AccessorHolder):
         if register is None:
@@ -0,0 +1,51 @@
+"""
+Reduction of long traces to about as many points as a plot can show. Both functions return (x, y) with x being the
+element index.
+"""
+import numpy as np
+
+
+def minmax(y: np.ndarray, buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """Minimum and maximum of each of the buckets, so peaks are never lost. Returns up to 2 * buckets points."""
+    n = len(y)
+    if n <= 2 * buckets:
+        return np.arange(n), y
+    starts = np.linspace(0, n, buckets + 1).astype(np.intp)[:-1]
+    centres = (starts + np.append(starts[1:], n) - 1) / 2
+    x = np.repeat(centres, 2)
+    decimated = np.empty(2 * buckets, dtype=np.result_type(y.dtype, np.float64))
+    decimated[0::2] = np.minimum.reduceat(y, starts)
+    decimated[1::2] = np.maximum.reduceat(y, starts)
+    return x, decimated
+
+
+def lttb(y: np.ndarray, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets: of each bucket the point forming the largest triangle with the point selected in
+    the previous bucket and the average of the next bucket is kept. Preserves the visual shape better than min/max
+    for smooth traces, but may drop single-sample spikes.
+    """
+    n = len(y)
+    if n <= points or points < 3:
+        return np.arange(n), y
+    values = np.asarray(y, dtype=np.float64)
+    # first and last point are always kept, the points in between are split into points - 2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(np.intp)
+    selected = np.empty(points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            nextStart, nextStop = edges[bucket + 1], edges[bucket + 2]
+            nextX = (nextStart + nextStop - 1) / 2
+            nextY = values[nextStart:nextStop].mean()
+        else:
+            nextX, nextY = n - 1, values[-1]
+        previous = selected[bucket]
+        candidates = np.arange(start, stop)
+        # twice the triangle area, the factor does not matter for the maximum
+        areas = np.abs((previous - nextX) * (values[start:stop] - values[previous]) -
+                       (previous - candidates) * (nextY - values[previous]))
+        selected[bucket + 1] = start + int(np.argmax(areas))
+    return selected, values[selected]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import deviceaccess as da
+    from chai.Replay import Replayer
+
+from chai.DeviceWorker import DeviceWorker
+
+
+class PooledDevice:
+    """A device of the pool together with the state which is restored when switching back to it."""
+    alias: str
+    device: da.Device
+    worker: DeviceWorker
+    isOpen: bool
+    registerPath: str | None
+    watchList: list[str]
+    registerNames: list[str] | None  # catalogue as shown in the register tree
+    replayer: Replayer | None  # for the virtual device of a recording
+
+    def __init__(self, alias: str, device: da.Device):
+        self.alias = alias
+        self.device = device
+        self.worker = DeviceWorker(device)
+        self.isOpen = False
+        self.registerPath = None
+        self.watchList = []
+        self.registerNames = None
+        self.replayer = None
+
+
+class DevicePool:
+    """
+    Devices selected before, so switching back to one of them neither creates nor opens it again. When more than
+    maxSize devices are selected, the least recently used ones are evicted. Closing evicted devices is left to the
+    caller.
+    """
+    maxSize: int
+
+    def __init__(self, maxSize: int = 4):
+        self.maxSize = maxSize
+        self._devices: OrderedDict[str, PooledDevice] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __iter__(self):
+        return iter(self._devices.values())
+
+    def peek(self, alias: str | None) -> PooledDevice | None:
+        """Pooled device of the alias, without marking it as used."""
+        if alias is None:
+            return None
+        return self._devices.get(alias)
+
+    def get(self, alias: str) -> PooledDevice | None:
+        entry = self._devices.get(alias)
+        if entry is not None:
+            self._devices.move_to_end(alias)
+        return entry
+
+    def entryOf(self, device: da.Device) -> PooledDevice | None:
+        for entry in self._devices.values():
+            if entry.device is device:
+                return entry
+        return None
+
+    def add(self, entry: PooledDevice) -> list[PooledDevice]:
+        """Add the device as most recently used one and return the evicted devices."""
+        self._devices[entry.alias] = entry
+        self._devices.move_to_end(entry.alias)
+        return self.shrink()
+
+    def shrink(self) -> list[PooledDevice]:
+        """Evict the least recently used devices beyond maxSize and return them."""
+        evicted = []
+        while len(self._devices) > max(self.maxSize, 1):
+            evicted.append(self._devices.popitem(last=False)[1])
+        return evicted
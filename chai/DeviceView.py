@@ -9,16 +9,16 @@ from textual.widgets import Button, Label, Static, Input, Button, ListView, List
 from textual.events import Click, MouseEvent
 from textual import on, log
 
-import deviceaccess as da
-
-from chai.RegisterView import RegisterTree
 from chai.Utils import InputWithEnterAction
 
 import os
-import sys
 from collections.abc import Iterator
 
 
+def is_recording(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "meta.json"))
+
+
 class DeviceList(ListView):
 
     _devices: dict[str, str] = {}
@@ -26,21 +26,33 @@ class DeviceList(ListView):
         app: LayoutApp
 
     def updateDmapFile(self, filename: str):
-        self.clear()
         if filename is None:
+            self.updateList()
             return
         self._devices = self._parseDmapFile(filename)
         if self._devices != {}:
-            self.extend([ListItem(Label(name)) for name in self._devices.keys()])
+            # deviceaccess is loaded only once a device is about to be used, to start faster
+            import deviceaccess as da
             da.setDMapFilePath(filename)
+        self.updateList()
+
+    def updateList(self) -> None:
+        """Devices of the dmap file, followed by the recordings opened for replay."""
+        self.clear()
+        self.extend([ListItem(Label(name)) for name in [*self._devices.keys(), *self.app.recordings.keys()]])
 
     def on_list_view_selected(self, selected: ListView.Selected) -> None:
         itemLabel = selected.item.children[0]
         assert isinstance(itemLabel, Label)
-        self.app.isOpen = False
-        self.app.deviceAlias = str(itemLabel.content)
-        self.app.deviceCdd = self._devices[self.app.deviceAlias]
-        self.app.isOpen = True
+        # the previously selected device is kept open in the device pool
+        alias = str(itemLabel.content)
+        if alias in self.app.recordings:
+            self.app.openRecording(self.app.recordings[alias].directory)
+            return
+        # the CDD must be known when the new device is announced, it keys the catalogue cache
+        self.app.deviceCdd = self._devices[alias]
+        self.app.deviceAlias = alias
+        self.app.openDevice()
 
     def _parseDmapFile(self, dmapPath: str) -> dict[str, str]:
         devices = {}
@@ -71,6 +83,7 @@ class DeviceList(ListView):
 
     def on_mount(self) -> None:
         self.watch(self.app, "dmapFilePath", lambda path: self.updateDmapFile(path))
+        self.watch(self.app, "recordings", lambda recordings: self.updateList(), init=False)
 
 
 class DeviceProperties(Vertical):
@@ -140,7 +153,7 @@ class DmapView(Vertical):
             Container(
                 Checkbox("Show hidden", id="checkbox_show_hidden", value=False, compact=True),
                 Checkbox("Only show .dmap files", id="checkbox_only_dmap", value=True, compact=True), classes="small_row"),
-            Label("Or enter dmap file path directly (enter to load):"),
+            Label("Or enter dmap file or recording (*.chairec) path directly (enter to load):"),
             Container(
                 InputWithEnterAction(placeholder="*.dmap", id="field_map_file", action=self._pressed_load_boards),
                 Button("Load dmap file", id="Btn_load_boards"),
@@ -150,15 +163,19 @@ class DmapView(Vertical):
 
     def on_mount(self) -> None:
         self.query_one("#directory_tree", DirectoryTree).guide_depth = 2
-        if len(sys.argv) > 1:
-            self.query_one("#field_map_file", Input).value = sys.argv[1]
+        if self.app.initialPath is not None:
+            self.query_one("#field_map_file", Input).value = self.app.initialPath
             self.query_one("#Btn_load_boards", Button).press()
 
     @on(Button.Pressed, "#Btn_load_boards")
     def _pressed_load_boards(self) -> None:
         mapFieldValue = self.query_one("#field_map_file", Input).value
         rootpath = self.query_one("#field_root_dir", Input).value
-        self.app.dmapFilePath = os.path.join(rootpath, mapFieldValue)
+        path = os.path.join(rootpath, mapFieldValue)
+        if is_recording(path):
+            self.app.openRecording(path)
+        else:
+            self.app.dmapFilePath = path
         self.app.switch_screen("device")
 
     @on(DirectoryTree.FileSelected, "#directory_tree")
@@ -196,7 +213,7 @@ class DmapView(Vertical):
             selectedNode = tree.cursor_node
             if selectedNode is not None:
                 data = selectedNode.data
-                if data is not None and data.path.is_file():
+                if data is not None and (data.path.is_file() or is_recording(str(data.path))):
                     self.query_one("#field_map_file", Input).value = str(
                         data.path.relative_to(self.query_one("#field_root_dir", Input).value))
                     self._pressed_load_boards()
@@ -206,6 +223,9 @@ class DeviceView(Vertical):
     if TYPE_CHECKING:
         app: LayoutApp
 
+    # a device has been double clicked, show its registers once it is open
+    _switchToRegistersWhenOpen: bool = False
+
     def compose(self) -> ComposeResult:
         yield Container(
             Container(
@@ -225,18 +245,34 @@ class DeviceView(Vertical):
     def on_mount(self) -> None:
 
         def change_is_open(open: bool) -> None:
-            self.query_one("#label_device_status", Label).update("Device is "+("open" if open else "closed"))
-            self.query_one("#btn_open_close_device", Button).label = "Close" if open else "Open"
+            if self.app.deviceOpening:
+                self.query_one("#label_device_status", Label).update("Opening device…")
+                self.query_one("#btn_open_close_device", Button).label = "Cancel"
+            else:
+                self.query_one("#label_device_status", Label).update("Device is "+("open" if open else "closed"))
+                self.query_one("#btn_open_close_device", Button).label = "Close" if open else "Open"
             self.query_one("#btn_open_close_device", Button).disabled = self.app.deviceAlias is None
+            if open and self._switchToRegistersWhenOpen:
+                self._switchToRegistersWhenOpen = False
+                self.app.switch_screen("register")
+            elif not open and not self.app.deviceOpening:
+                # opening failed or has been cancelled
+                self._switchToRegistersWhenOpen = False
 
         self.watch(self.app, "isOpen", change_is_open)
+        self.watch(self.app, "deviceOpening", lambda opening: change_is_open(self.app.isOpen))
 
         self.watch(self.app, "deviceCdd", lambda cdd: self.query_one(
             "#field_device_identifier", Label).update(cdd or "-"))
 
     @on(Button.Pressed, "#btn_open_close_device")
     def _pressed_open_close_device(self) -> None:
-        self.app.isOpen = not self.app.isOpen
+        if self.app.isOpen:
+            self.app.closeDevice()
+        elif self.app.deviceOpening:
+            self.app.cancelOpen()
+        else:
+            self.app.openDevice()
 
     @on(Click)
     def _on_double_click(self, event: Click) -> None:
@@ -246,6 +282,9 @@ class DeviceView(Vertical):
             if list.index is None or item is None:
                 return
             list.on_list_view_selected(ListView.Selected(list, item, list.index))
-            # TODO: bad devices should not result in a switch to register screen
             if self.app.isOpen:
+                # the device was still open in the device pool
                 self.app.switch_screen("register")
+                return
+            # opening happens in the background, bad devices do not result in a switch to the register screen
+            self._switchToRegistersWhenOpen = self.app.deviceOpening
@@ -0,0 +1,36 @@
+from __future__ import annotations
+import queue
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import deviceaccess as da
+
+
+class DeviceWorker:
+    """
+    Runs the blocking operations of one device (open, close, ...) one after another in a background thread. The thread
+    is a daemon, so a backend which never returns neither blocks the UI nor keeps Chai from exiting.
+    """
+    device: da.Device
+    latestOpen: int = 0  # request id of the open submitted last, set by the app
+
+    def __init__(self, device: da.Device):
+        self.device = device
+        self._jobs: queue.SimpleQueue[Callable[[], None] | None] = queue.SimpleQueue()
+        threading.Thread(target=self._run, daemon=True, name="DeviceWorker").start()
+
+    def submit(self, job: Callable[[], None]) -> None:
+        self._jobs.put(job)
+
+    def shutdown(self) -> None:
+        """Stop the thread once all jobs submitted so far are done."""
+        self._jobs.put(None)
+
+    def _run(self) -> None:
+        while (job := self._jobs.get()) is not None:
+            try:
+                job()
+            except Exception:
+                # e.g. the app has exited while the job was running and results cannot be delivered anymore
+                pass
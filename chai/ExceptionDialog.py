@@ -38,10 +38,10 @@ class ExceptionDialog(ModalScreen):
     @on(Button.Pressed, "#exception_dialog_ok")
     def pressed_ok(self) -> None:
         self.app.pop_screen()
-        self.app.isOpen = False
+        self.app.closeDevice()
 
     @on(Button.Pressed, "#exception_dialog_reopen")
     def pressed_reopen(self) -> None:
         self.app.pop_screen()
-        self.app.isOpen = False
-        self.app.isOpen = True
+        self.app.closeDevice()
+        self.app.openDevice()
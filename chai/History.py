@@ -0,0 +1,125 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import numpy as np
+if TYPE_CHECKING:
+    from chai.Acquisition import Frame
+
+
+class RingBuffer:
+    """
+    Preallocated history of the full content of one register. Frames are appended from the acquisition thread, the
+    UI reads from it concurrently, so all access is guarded by a lock.
+    """
+    depth: int
+
+    def __init__(self, depth: int, shape: tuple[int, int], dtype: np.dtype):
+        self.depth = depth
+        self._data = np.empty((depth,) + shape, dtype=dtype)
+        self._timestamps = np.empty(depth, dtype=np.float64)
+        self._next = 0  # slot of the next frame
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._timestamps.nbytes
+
+    def matches(self, data: np.ndarray) -> bool:
+        return data.shape == self._data.shape[1:] and data.dtype == self._data.dtype
+
+    def append(self, data: np.ndarray, timestamp: float) -> None:
+        with self._lock:
+            self._data[self._next] = data
+            self._timestamps[self._next] = timestamp
+            self._next = (self._next + 1) % self.depth
+            self._count = min(self._count + 1, self.depth)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._next = 0
+            self._count = 0
+
+    def _slots(self, n: int | None) -> np.ndarray:
+        """Slots of the last n frames, oldest first."""
+        count = self._count if n is None else min(n, self._count)
+        return np.arange(self._next - count, self._next) % self.depth
+
+    def series(self, channel: int, element: int, n: int | None = None) -> np.ndarray:
+        """The last n values of one element, oldest first."""
+        with self._lock:
+            return self._data[self._slots(n), channel, element]
+
+    def frames(self, n: int | None = None, channels: list[int] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Copy of the last n frames with shape (n, channels, elements) and their timestamps, oldest first. Only the
+        given channels are copied, if any."""
+        with self._lock:
+            slots = self._slots(n)
+            if channels is None:
+                return self._data[slots], self._timestamps[slots]
+            return self._data[np.ix_(slots, channels)], self._timestamps[slots]
+
+
+class HistoryStore:
+    """
+    Ring buffers of the registers acquired continuously, keyed by (device alias, register path). Each buffer holds up
+    to depth frames, fewer if its frames are too large for the memory budget. The budget is shared by all buffers,
+    the least recently used ones are dropped when it is exceeded.
+    """
+    depth: int
+    memoryBudget: int  # bytes
+
+    def __init__(self, depth: int = 1000, memoryBudget: int = 256 * 1024 * 1024):
+        self.depth = depth
+        self.memoryBudget = memoryBudget
+        self._buffers: OrderedDict[tuple, RingBuffer] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in list(self._buffers.values()))
+
+    def configure(self, depth: int, memoryBudget: int) -> None:
+        """Change the limits. All history is dropped, buffers are allocated again with the next frame."""
+        with self._lock:
+            self.depth = max(depth, 2)
+            self.memoryBudget = memoryBudget
+            self._buffers.clear()
+
+    def get(self, key: tuple) -> RingBuffer | None:
+        return self._buffers.get(key)
+
+    def append(self, key: tuple, frame: Frame) -> None:
+        """Add a frame, called from the acquisition threads. Frames of void registers are ignored."""
+        data = frame.data
+        if data is None or not np.issubdtype(data.dtype, np.number):
+            return
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None or not buffer.matches(data):
+                buffer = self._allocate(key, data)
+            self._buffers.move_to_end(key)
+        buffer.append(data, frame.timestamp.timestamp())
+
+    def _allocate(self, key: tuple, data: np.ndarray) -> RingBuffer:
+        self._buffers.pop(key, None)
+        depth = max(min(self.depth, self.memoryBudget // max(data.nbytes, 1)), 2)
+        buffer = RingBuffer(depth, data.shape, data.dtype)
+        used = sum(existing.nbytes for existing in self._buffers.values())
+        while len(self._buffers) > 0 and used + buffer.nbytes > self.memoryBudget:
+            used -= self._buffers.popitem(last=False)[1].nbytes
+        self._buffers[key] = buffer
+        return buffer
+
+    def clear(self, key: tuple) -> None:
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            buffer.clear()
@@ -1,10 +1,21 @@
-from chai.DeviceView import DeviceView, DeviceProperties, DmapView
-from chai.RegisterView import RegisterView
-from chai.DataView import DataView, RegisterInfo
-from chai.ActionsView import ActionsView
-from chai.Utils import AccessorHolder
-from chai import Utils
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    # views, NumPy and deviceaccess are imported where they are used first, so the first screen shows up quickly
+    import deviceaccess as da
+    from chai.Accessors import AccessorHolder
+    from chai.Acquisition import PollAcquisition, PushAcquisition, LatestFrame, WatchListAcquisition, LatestFrames, \
+        Frame
+    from chai.Recording import Recorder, Recording
+    from chai.Replay import Replayer
+    from chai.History import HistoryStore
+    from chai.Statistics import RunningStatistics
+    from chai.Timing import ReadTiming
+from chai.AccessorCache import AccessorCache
+from chai.DeviceWorker import DeviceWorker
+from chai.DevicePool import DevicePool, PooledDevice
 from chai.ExceptionDialog import ExceptionDialog
+from chai import Profiling
 
 from textual.app import App, ComposeResult
 from textual.screen import Screen
@@ -16,19 +27,23 @@ from textual.widgets import Static, Button
 from textual.widgets._footer import FooterKey, FooterLabel
 from textual.reactive import Reactive
 from textual import on, work
-from textual.worker import get_current_worker
 from textual.timer import Timer
 
 from collections import defaultdict
 from datetime import datetime
 from itertools import groupby
+import os
 import socket
-import deviceaccess as da
+import time
 
 
 class ConsoleHardwareInterface(Container):
 
     def compose(self) -> ComposeResult:
+        from chai.DeviceView import DeviceView
+        from chai.RegisterView import RegisterView
+        from chai.DataView import DataView
+        from chai.ActionsView import ActionsView
         yield Horizontal(
             DeviceView(),
             RegisterView(),
@@ -109,6 +124,7 @@ class NaviFooter(Footer):
 class DmapScreen(Screen):
 
     def compose(self) -> ComposeResult:
+        from chai.DeviceView import DmapView
         yield Header()
         yield DmapView()
         yield NaviFooter(currentScreen="dmap")
@@ -117,6 +133,7 @@ class DmapScreen(Screen):
 class DeviceScreen(Screen):
 
     def compose(self) -> ComposeResult:
+        from chai.DeviceView import DeviceView
         yield Header()
         yield DeviceView()
         yield NaviFooter(currentScreen="devices")
@@ -125,6 +142,7 @@ class DeviceScreen(Screen):
 class PropertiesScreen(Screen):
 
     def compose(self) -> ComposeResult:
+        from chai.DeviceView import DeviceProperties
         yield Header()
         yield DeviceProperties()
         yield NaviFooter(currentScreen="properties")
@@ -133,6 +151,7 @@ class PropertiesScreen(Screen):
 class RegisterScreen(Screen):
 
     def compose(self) -> ComposeResult:
+        from chai.RegisterView import RegisterView
         yield Header()
         yield RegisterView()
         yield NaviFooter(currentScreen="registers")
@@ -141,6 +160,7 @@ class RegisterScreen(Screen):
 class MetaDataScreen(Screen):
 
     def compose(self) -> ComposeResult:
+        from chai.DataView import RegisterInfo
         yield Header()
         yield RegisterInfo(id="register_info")
         yield NaviFooter(currentScreen="meta")
@@ -149,6 +169,7 @@ class MetaDataScreen(Screen):
 class ContentScreen(Screen):
 
     def compose(self) -> ComposeResult:
+        from chai.DataView import DataView
         yield Header()
         yield DataView()
         yield NaviFooter(currentScreen="content")
@@ -157,11 +178,52 @@ class ContentScreen(Screen):
 class OptionsScreen(Screen):
 
     def compose(self) -> ComposeResult:
+        from chai.ActionsView import ActionsView
         yield Header()
         yield ActionsView()
         yield NaviFooter(currentScreen="options")
 
 
+class DashboardScreen(Screen):
+
+    def compose(self) -> ComposeResult:
+        from chai.DashboardView import DashboardView
+        yield Header()
+        yield DashboardView()
+        yield NaviFooter(currentScreen="dashboard")
+
+
+class StatisticsScreen(Screen):
+
+    def compose(self) -> ComposeResult:
+        from chai.StatisticsView import StatisticsView
+        yield Header()
+        yield StatisticsView()
+        yield NaviFooter(currentScreen="statistics")
+
+
+class TimingScreen(Screen):
+
+    def compose(self) -> ComposeResult:
+        from chai.TimingView import TimingView
+        yield Header()
+        yield TimingView()
+        yield NaviFooter(currentScreen="timing")
+
+
+class PlotScreen(Screen):
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        try:
+            from chai.Plotting import PlotView
+        except ImportError:
+            yield Static("Plotting requires textual-plotext (pip install textual-plotext).")
+        else:
+            yield PlotView()
+        yield NaviFooter(currentScreen="plot")
+
+
 class MainScreen(Screen):
     CSS_PATH = "Chai.tcss"
     TITLE = "Console Hardware Interface"
@@ -186,7 +248,9 @@ class LayoutApp(App):
     TITLE = "Console Hardware Interface"
     SUB_TITLE = f"@ {socket.gethostname()}"
     SCREENS = {"dmap": DmapScreen, "device": DeviceScreen, "properties": PropertiesScreen,
-               "register": RegisterScreen, "metadata": MetaDataScreen, "content": ContentScreen, "options": OptionsScreen}
+               "register": RegisterScreen, "metadata": MetaDataScreen, "content": ContentScreen, "options": OptionsScreen,
+               "dashboard": DashboardScreen, "plot": PlotScreen, "statistics": StatisticsScreen,
+               "timing": TimingScreen}
     BINDINGS = [
         # TODO: seperate bindings from displayed text, so that it is not removed when key is bind by another action in some field. Or give priority to the main screen bindings
         Binding(key="ctrl+m", priority=True, tooltip="Load dmap file",
@@ -203,10 +267,28 @@ class LayoutApp(App):
         # Binding(
         #    key="ctrl+a", priority=True, tooltip="Show Register Content", action="switch_screen('content')", description="Register Content Screen", group=SortedGroup("content", order=5)),
         Binding(
-            key="ctrl+o", priority=True, tooltip="Show Options", action="switch_screen('options')", description="Options Screen", group=SortedGroup("options", order=6)),
+            key="ctrl+b", priority=True, tooltip="Show Pinned Registers", action="switch_screen('dashboard')", description="Dashboard Screen", group=SortedGroup("dashboard", order=5)),
+        Binding(
+            key="ctrl+g", priority=True, tooltip="Plot Register Content", action="switch_screen('plot')", description="Plot Screen", group=SortedGroup("plot", order=6)),
+        Binding(
+            key="ctrl+t", priority=True, tooltip="Show Statistics of the Register Content", action="switch_screen('statistics')", description="Statistics Screen", group=SortedGroup("statistics", order=7)),
+        Binding(
+            key="ctrl+l", priority=True, tooltip="Show Latency of the Continuous Read", action="switch_screen('timing')", description="Timing Screen", group=SortedGroup("timing", order=8)),
+        Binding(
+            key="ctrl+o", priority=True, tooltip="Show Options", action="switch_screen('options')", description="Options Screen", group=SortedGroup("options", order=9)),
     ]
 
-    _update_timer: Timer | None = None
+    _acquisition: PollAcquisition | PushAcquisition | None = None
+    _latestFrame: LatestFrame | None = None
+    _render_timer: Timer | None = None
+    _continuousHistoryKey: tuple | None = None  # history filled by the continuous read, the watch list skips it
+    _deviceWorker: DeviceWorker | None = None
+    _openRequest: int = 0  # incremented whenever the result of a pending open becomes obsolete
+    _watchAcquisition: WatchListAcquisition | None = None
+    _latestWatchFrames: LatestFrames | None = None
+    _watch_render_timer: Timer | None = None
+    accessorCache: AccessorCache
+    devicePool: DevicePool
 
     dmapFilePath: Reactive[str | None] = Reactive(None)
 
@@ -215,6 +297,8 @@ class LayoutApp(App):
     currentDevice: Reactive[da.Device | None] = Reactive(None)
 
     isOpen: Reactive[bool] = Reactive(False)
+    deviceOpening: Reactive[bool] = Reactive(False)
+    openTimeout: float = 10.  # seconds
 
     registerPath: Reactive[str | None] = Reactive(None)
     register: Reactive[AccessorHolder | None] = Reactive(None)
@@ -230,101 +314,247 @@ class LayoutApp(App):
     dummyWrite: bool = False
     enableReadButton: bool = False
     enableWriteButton: bool = False
-    continuousPollHz: Reactive[float] = Reactive(1.)
+    continuousPollHz: Reactive[float] = Reactive(30.)  # default of the options screen, which is created lazily
+    renderHz: Reactive[float] = Reactive(30.)
+    coalescedFrames: int = 0  # frames acquired but never displayed since the start of the continuous read
+    recording: Reactive[bool] = Reactive(False)  # record the frames of the continuous read
+    recordingDirectory: str = "."
+    recorder: Recorder | None = None
+    recordings: Reactive[dict[str, Recording]] = Reactive(dict)  # opened for replay, by device alias
+    historyDepth: int = 1000  # frames per register
+    historyMemory: int = 256  # MiB for the history of all registers
+    _historyStore: HistoryStore | None = None
+    statistics: RunningStatistics | None = None  # of the frames of the continuous read of the selected register
+    readTiming: ReadTiming | None = None  # of the last continuous read, kept after it stopped
+
+    watchList: Reactive[list[str]] = Reactive(list)  # paths of the pinned registers of the current device
+    watchListActive: Reactive[bool] = Reactive(False)
+    watchRegisters: dict[str, AccessorHolder]  # accessor setup of the pinned registers being acquired
+    watchValues: dict[str, Frame]  # latest frame of each pinned register
+    watchUpdated: set[str]  # pinned registers which got a new frame with the last watchValuesChanged
+    watchValuesChanged: Reactive[datetime | None] = Reactive(None)
+
+    def __init__(self, *args, initialPath: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.initialPath = initialPath  # dmap file or recording to load at start
+        self.accessorCache = AccessorCache()
+        self.devicePool = DevicePool()
+        self.watchRegisters = {}
+        self.watchValues = {}
+        self.watchUpdated = set()
 
     def on_mount(self) -> None:
-        self.push_screen("device")
-        # self.push_screen("properties") # currently not useful
-        self.push_screen("register")
-        self.push_screen("metadata")
-        # self.push_screen("content")
-        self.push_screen("options")
+        # the other screens are created when they are shown first. Their views catch up with the app state when
+        # mounted, since watchers are initialised with the current values.
         self.push_screen("dmap")
         # self.push_screen(MainScreen()) # uncomment to see the original layout with all views visible
-
-    def watch_deviceAlias(self, new_alias: str) -> None:
+        if Profiling.active():
+            # cProfile only covers the thread it was started in, so the window is ended from the event loop
+            self.set_timer(max(Profiling.remaining_window(), 0.01), Profiling.stop_window)
+
+    def on_unmount(self) -> None:
+        # the recorder still writes the queued frames before Chai exits
+        self._stop_acquisition()
+        self._stop_watch_acquisition()
+
+    def watch_deviceAlias(self, old_alias: str | None, new_alias: str) -> None:
+        self.cancelOpen()
+        previous = self.devicePool.peek(old_alias)
+        if previous is not None and previous.device is self.currentDevice:
+            # the previous device stays open in the pool, remember where we were for switching back
+            previous.isOpen = self.isOpen
+            previous.registerPath = self.registerPath
+            previous.watchList = self.watchList
         self.registerPath = None
+        self.watchList = []
+
+        entry = self.devicePool.get(new_alias)
+        if entry is None:
+            import deviceaccess as da
+            recording = self.recordings.get(new_alias)
+            try:
+                if recording is None:
+                    device = da.Device(new_alias)
+                else:
+                    from chai.Replay import Replayer, replay_cdd
+                    device = da.Device(replay_cdd(recording))
+            except RuntimeError as e:
+                self._deviceWorker = None
+                self.isOpen = False
+                self.currentDevice = None
+                self.app.push_screen(ExceptionDialog(f"Error while creating device '{new_alias}'", e, False))
+                return
+            entry = PooledDevice(new_alias, device)
+            if recording is not None:
+                entry.replayer = Replayer(recording, device)
+                # the register tree shows the catalogue of the recorded device, with the recorded register selected
+                entry.registerNames = [register["name"] for register in recording.meta["catalogue"]]
+                entry.registerPath = recording.registerPath
+            for evicted in self.devicePool.add(entry):
+                self._evictDevice(evicted)
+
+        self._deviceWorker = entry.worker
+        self.currentDevice = entry.device
+        self.isOpen = entry.isOpen
+        self.registerPath = entry.registerPath
+        self.watchList = entry.watchList
+        # the watch list might be equal to the one of the previous device
+        self._start_watch_acquisition()
+
+    def setDevicePoolSize(self, size: int) -> None:
+        self.devicePool.maxSize = size
+        for evicted in self.devicePool.shrink():
+            self._evictDevice(evicted)
+
+    def _evictDevice(self, entry: PooledDevice) -> None:
+        self.accessorCache.invalidate(entry.alias)
+        if entry.replayer is not None:
+            entry.replayer.stop()
+        if entry.isOpen:
+            entry.worker.submit(entry.device.close)
+        # a close submitted before is still executed
+        entry.worker.shutdown()
+
+    @property
+    def replayer(self) -> Replayer | None:
+        """Replay of the current device, if it is the virtual device of a recording."""
+        entry = self.devicePool.peek(self.deviceAlias)
+        if entry is None or entry.device is not self.currentDevice:
+            return None
+        return entry.replayer
+
+    def openRecording(self, path: str) -> None:
+        """Add the recording as a virtual device and select it."""
+        from chai.Recording import Recording
+        from chai.Replay import replay_cdd
         try:
-            self.currentDevice = da.Device(new_alias)
-        except RuntimeError as e:
-            self.app.push_screen(ExceptionDialog(f"Error while creating device '{new_alias}'", e, False))
+            recording = Recording(path)
+            cdd = replay_cdd(recording)
+        except (OSError, ValueError, KeyError, RuntimeError) as e:
+            self.notify(str(e), title="Could not open the recording", severity="error")
+            return
+        alias = f"replay:{os.path.basename(os.path.normpath(path))}"
+        if alias not in self.recordings:
+            self.recordings = dict(self.recordings, **{alias: recording})
+        self.deviceCdd = cdd
+        self.deviceAlias = alias
+        self.openDevice()
+
+    def openDevice(self) -> None:
+        """Open the current device in the background. isOpen becomes True once done, deviceOpening is set meanwhile."""
+        if self.currentDevice is None or self._deviceWorker is None or self.isOpen or self.deviceOpening:
+            return
+        self._openRequest += 1
+        request = self._openRequest
+        device = self.currentDevice
 
-    def watch_isOpen(self, open: bool) -> None:
-        if self._update_timer is not None:
-            self._update_timer.stop()
-            self._update_timer = None
+        def job() -> None:
+            from chai import Accessors
+            try:
+                device.open()
+                # together with the open, so it does not block the UI and is covered by the same timeout
+                if any(Accessors.needs_async_read(info) for info in device.getRegisterCatalogue()):
+                    device.activateAsyncRead()
+            except RuntimeError as e:
+                self.call_from_thread(self._device_open_done, device, request, e)
+                return
+            self.call_from_thread(self._device_open_done, device, request, None)
+
+        self.deviceOpening = True
+        self._deviceWorker.latestOpen = request
+        self._deviceWorker.submit(job)
+        self.set_timer(self.openTimeout, lambda: self._device_open_timeout(request))
+
+    def cancelOpen(self) -> None:
+        if self.deviceOpening:
+            # the pending open cannot be aborted, its result is discarded
+            self._openRequest += 1
+            self.deviceOpening = False
+
+    def closeDevice(self) -> None:
+        self.cancelOpen()
+        if not self.isOpen or self.currentDevice is None:
+            return
+        self.isOpen = False
+        self._closeInBackground(self.currentDevice)
 
-        if self.pushMode and self.register is not None:
-            self.register.accessor.interrupt()
+    def _closeInBackground(self, device: da.Device) -> None:
+        entry = self.devicePool.entryOf(device)
+        if entry is not None:
+            entry.worker.submit(device.close)
+        else:
+            worker = DeviceWorker(device)
+            worker.submit(device.close)
+            worker.shutdown()
+
+    def _device_open_done(self, device: da.Device, request: int, exception: RuntimeError | None) -> None:
+        if request != self._openRequest or device is not self.currentDevice:
+            # cancelled, timed out or another device has been selected meanwhile. If the device is being opened again,
+            # the newer open is queued after this one and closing would undo it.
+            entry = self.devicePool.entryOf(device)
+            if exception is None and (entry is None or entry.worker.latestOpen == request):
+                self._closeInBackground(device)
+            return
+        if exception is not None:
+            self.deviceOpening = False
+            # the open itself might have succeeded before activating async read failed
+            self._closeInBackground(device)
+            self.push_screen(ExceptionDialog(f"Error while opening device '{self.deviceAlias}'", exception, False))
+            return
+        self.isOpen = True
+        self.deviceOpening = False
+
+    def _device_open_timeout(self, request: int) -> None:
+        if request != self._openRequest or not self.deviceOpening:
+            return
+        self.cancelOpen()
+        self.push_screen(ExceptionDialog(f"Error while opening device '{self.deviceAlias}'", RuntimeError(
+            f"Opening the device did not finish within {self.openTimeout:g} s."), True))
+
+    def watch_isOpen(self, open: bool) -> None:
+        self._stop_acquisition()
+        self._stop_watch_acquisition()
 
         if self.currentDevice is None:
             return
 
         if open:
             try:
-                self.currentDevice.open()
                 self.watch_registerPath(self.registerPath)
             except RuntimeError as e:
                 self.app.push_screen(ExceptionDialog(f"Error while opening device '{self.deviceAlias}'", e, False))
+            self._start_watch_acquisition()
         else:
-            self.currentDevice.close()
+            # accessors must not outlive a close, async read is only activated again by re-opening
+            self.accessorCache.invalidate(self.deviceAlias)
             self.enableReadButton = False
             self.enableWriteButton = False
 
-        if open and self.register is not None and self.register.accessor.isReadable():
-            try:
-                self.register.accessor.readLatest()
-                self.registerValueChanged = datetime.now()
-            except RuntimeError as e:
-                self.app.push_screen(ExceptionDialog("Error while reading from device", e, False))
-
+    @Profiling.timed("LayoutApp.watch_registerPath")
     def watch_registerPath(self, path: str | None) -> None:
         if path is None or self.currentDevice is None:
             self.register = None
             return
 
-        rc = self.currentDevice.getRegisterCatalogue()
-        info = rc.getRegister(path)
-
-        dd = info.getDataDescriptor()
-        if da.AccessMode.raw in info.getSupportedAccessModes():
-            # raw transfers are supported
-            np_type = Utils.get_raw_numpy_type(dd.rawDataType())
-            flags = [da.AccessMode.raw]
-        else:
-            # no raw transfer supported
-            np_type = Utils.get_raw_numpy_type(dd.minimumDataType())
-            flags = []
-
-        dummyWriteFlags = flags
-
-        if da.AccessMode.wait_for_new_data in info.getSupportedAccessModes():
-            # we cannot use raw and wait_for_new_data at the same time
-            self.currentDevice.activateAsyncRead()
-            flags = [da.AccessMode.wait_for_new_data]
-
-        dummyWritePath = path+".DUMMY_WRITEABLE"
-        self.dummyWrite = not info.isWriteable() and rc.hasRegister(dummyWritePath)
+        register = self._createAccessorHolder(path)
+        self.dummyWrite = register.dummyWriteAccessor is not None
 
         if self.isOpen:
-            self.enableReadButton = info.isReadable()
-            self.enableWriteButton = info.isWriteable() or self.dummyWrite
-
-        dummyWriteAccessor = None
-        if info.getDataDescriptor().fundamentalType() != da.FundamentalType.nodata:
-            accessor = self.currentDevice.getTwoDRegisterAccessor(np_type, path, accessModeFlags=flags)
-            if self.dummyWrite:
-                dummyWriteAccessor = self.currentDevice.getTwoDRegisterAccessor(
-                    np_type, dummyWritePath, accessModeFlags=dummyWriteFlags)
-        else:
-            accessor = self.currentDevice.getVoidRegisterAccessor(path, accessModeFlags=flags)
-            if self.dummyWrite:
-                dummyWriteAccessor = self.currentDevice.getVoidRegisterAccessor(
-                    dummyWritePath, accessModeFlags=dummyWriteFlags)
+            self.enableReadButton = register.info.isReadable()
+            self.enableWriteButton = register.info.isWriteable() or self.dummyWrite
+
+        self.register = register
 
-        self.register = AccessorHolder(accessor, info, dummyWriteAccessor)
+    def _createAccessorHolder(self, path: str) -> AccessorHolder:
+        from chai import Accessors
+        assert self.currentDevice is not None
+        # async read has been activated by openDevice() if the device has push-type registers
+        catalogue = self.currentDevice.getRegisterCatalogue()
+        return Accessors.create_accessor_holder(self.currentDevice, catalogue, path, self.accessorCache,
+                                                self.deviceAlias)
 
     @on(Button.Pressed, "#btn_read")
+    @Profiling.timed("LayoutApp._pressed_read")
     def _pressed_read(self) -> None:
         if self.register is None or not self.isOpen:
             return
@@ -350,60 +580,303 @@ class LayoutApp(App):
             self._pressed_read()
 
     def watch_continuousRead(self, continuousRead) -> None:
-        if not self.pushMode:
-            self.watch_continuousPollHz(self.continuousPollHz)
-            assert self._update_timer is not None
-            if continuousRead:
-                self._update_timer.resume()
-            else:
-                self._update_timer.pause()
+        if continuousRead:
+            self._start_acquisition()
         else:
-            if continuousRead:
-                self._update_push_loop()
-            else:
-                if self.register is not None:
-                    self.register.accessor.interrupt()
+            self._stop_acquisition()
 
     def watch_continuousPollHz(self, hz) -> None:
-        if self._update_timer is not None:
-            self._update_timer.stop()
-        self._update_timer = self.set_interval(1 / hz, self._pressed_read)
-
-    def watch_register(self,  old_register: AccessorHolder, new_register: AccessorHolder) -> None:
-        if self._update_timer is not None:
-            self._update_timer.stop()
-            self._update_timer = None
+        from chai.Acquisition import PollAcquisition
+        if isinstance(self._acquisition, PollAcquisition):
+            # restart instead of adjusting the rate, so a long wait of the old schedule is not finished first
+            self._start_acquisition()
+        if self._watchAcquisition is not None:
+            self._start_watch_acquisition()
+
+    def watch_renderHz(self, hz) -> None:
+        if self.readTiming is not None:
+            self.readTiming.renderHz = hz
+        if self._render_timer is not None:
+            self._render_timer.stop()
+            self._render_timer = self.set_interval(1 / hz, self._render_latest_frame)
+        if self._watch_render_timer is not None:
+            self._watch_render_timer.stop()
+            self._watch_render_timer = self.set_interval(1 / hz, self._render_watch_frames)
+
+    def _start_acquisition(self) -> None:
+        # a restart, e.g. with another poll rate, continues the recording
+        self._stop_acquisition(keepRecording=True)
+        if self.register is None or self.currentDevice is None or not self.isOpen:
+            return
+        try:
+            accessor = self.register.createReadAccessor(self.currentDevice)
+        except RuntimeError as e:
+            self.push_screen(ExceptionDialog("Error reading from device", e, True))
+            return
 
+        from chai.Acquisition import PollAcquisition, PushAcquisition, LatestFrame
+        from chai.Statistics import RunningStatistics
+        from chai.Conversion import RawConverter
+        from chai.Timing import ReadTiming
+        import deviceaccess as da
+        import numpy as np
+        latestFrame = LatestFrame()
+        if self.recording and self.recorder is None:
+            self._start_recording()
+        history = self.historyStore
+        historyKey = self.historyKey(self.registerPath)
+        # a restart continues the statistics, they are reset with the register
+        if self.statistics is None:
+            self.statistics = RunningStatistics()
+        statistics = self.statistics
+        # the conversion must be set up before the acquisition thread uses the accessor
+        converter = RawConverter(accessor, self.register.info) if self._isRaw and \
+            isinstance(accessor, da.TwoDRegisterAccessor) else None
+
+        # deadlines depend on the poll rate, so the timing starts anew with each restart
+        timing = ReadTiming(None if self.pushMode else self.continuousPollHz, self.renderHz,
+                            {"deviceAlias": self.deviceAlias, "registerPath": self.registerPath, "push": self.pushMode})
+        self.readTiming = timing
+
+        @Profiling.timed("LayoutApp.onFrame")
+        def onFrame(frame: Frame) -> None:
+            timing.acquired(frame)
+            history.append(historyKey, frame)
+            if frame.data is not None and np.issubdtype(frame.data.dtype, np.number):
+                statistics.add(converter.cookedValues(frame.data) if converter is not None else frame.data,
+                               frame.timestamp.timestamp())
+            latestFrame.put(frame)
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.put(frame)
+
+        def onError(exception: RuntimeError) -> None:
+            self.call_from_thread(self._acquisition_error, acquisition, exception)
+
+        acquisition: PollAcquisition | PushAcquisition
         if self.pushMode:
-            old_register.accessor.interrupt()
+            acquisition = PushAcquisition(accessor, onFrame, onError)
+        else:
+            acquisition = PollAcquisition(accessor, self.continuousPollHz, onFrame, onError)
+        self._acquisition = acquisition
+        self._latestFrame = latestFrame
+        self._continuousHistoryKey = historyKey
+        self.coalescedFrames = 0
+        self._render_timer = self.set_interval(1 / self.renderHz, self._render_latest_frame)
+        self._acquisition_loop(acquisition)
+
+    def _stop_acquisition(self, keepRecording: bool = False) -> None:
+        if self._render_timer is not None:
+            self._render_timer.stop()
+            self._render_timer = None
+        if self._acquisition is not None:
+            self._acquisition.stop()
+            self._acquisition = None
+        self._latestFrame = None
+        self._continuousHistoryKey = None
+        if not keepRecording:
+            self._stop_recording()
+
+    def watch_recording(self, recording: bool) -> None:
+        if not recording:
+            self._stop_recording()
+        elif self._acquisition is not None and self.recorder is None:
+            self._start_recording()
+
+    def _start_recording(self) -> None:
+        if self.register is None or self.currentDevice is None:
+            return
+        from chai import CatalogueCache
+        from chai.Recording import Recorder, recording_name
+        import deviceaccess as da
+
+        path = str(self.register.info.getRegisterName())
+        meta = {
+            "deviceAlias": self.deviceAlias,
+            "deviceCdd": self.deviceCdd,
+            "registerPath": path,
+            "raw": da.AccessMode.raw in self.register.flags,
+            "push": self.pushMode,
+            "pollHz": self.continuousPollHz,
+            "catalogue": CatalogueCache.snapshot_catalogue(self.currentDevice.getRegisterCatalogue()),
+        }
+        mapFile = CatalogueCache.map_file_of(self.deviceCdd, self.dmapFilePath) if self.deviceCdd else None
+        try:
+            self.recorder = Recorder(os.path.join(self.recordingDirectory, recording_name(self.deviceAlias, path)),
+                                     meta, mapFile)
+        except OSError as e:
+            self.recording = False
+            self.notify(str(e), title="Could not start the recording", severity="error")
+
+    @property
+    def historyStore(self) -> HistoryStore:
+        # created with the first acquisition, NumPy is not needed for the first screen
+        if self._historyStore is None:
+            from chai.History import HistoryStore
+            self._historyStore = HistoryStore(self.historyDepth, self.historyMemory * 1024 * 1024)
+        return self._historyStore
+
+    def historyKey(self, path: str) -> tuple:
+        return (self.deviceAlias, path)
+
+    def setHistoryLimits(self, depth: int, memory: int) -> None:
+        self.historyDepth = depth
+        self.historyMemory = memory
+        if self._historyStore is not None:
+            self._historyStore.configure(depth, memory * 1024 * 1024)
+
+    def _stop_recording(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    @work(exclusive=True, thread=True)
+    def _acquisition_loop(self, acquisition: PollAcquisition | PushAcquisition) -> None:
+        acquisition.run()
+
+    @Profiling.timed("LayoutApp._render_latest_frame")
+    def _render_latest_frame(self) -> None:
+        if self._latestFrame is None or self.register is None:
+            return
+        frame = self._latestFrame.take()
+        if frame is None:
+            return
+        started = time.monotonic()
+        if frame.data is not None:
+            self.register.accessor.set(frame.data)
+        self.coalescedFrames = self._latestFrame.coalesced
+        self.registerValueChanged = frame.timestamp
+        if self.readTiming is not None:
+            self.readTiming.rendered(frame, started, time.monotonic())
+
+    def _acquisition_error(self, acquisition: PollAcquisition | PushAcquisition, exception: RuntimeError) -> None:
+        if acquisition is not self._acquisition:
+            return
+        self._stop_acquisition()
+        self.push_screen(ExceptionDialog("Error while reading from device", exception, True))
+
+    def watch_register(self,  old_register: AccessorHolder, new_register: AccessorHolder) -> None:
+        self._stop_acquisition()
+        self.statistics = None
 
         self.channel = 0
-        if new_register is not None:
+        if new_register is None:
+            self.pushMode = False
+        else:
+            import deviceaccess as da
+            self.pushMode = da.AccessMode.wait_for_new_data in new_register.accessor.getAccessModeFlags()
             self._isRaw = da.AccessMode.raw in new_register.accessor.getAccessModeFlags()
             if self.isOpen and new_register.accessor.isReadable():
-                try:
-                    new_register.accessor.readLatest()
-                    self.registerValueChanged = datetime.now()
-                except RuntimeError as e:
-                    self.app.push_screen(ExceptionDialog("Error reading from device", e, True))
+                # start reading only after all watchers of the new register have run
+                self.call_later(self._initial_read, new_register)
 
-    @work(exclusive=True, thread=True)
-    def _update_push_loop(self) -> None:
-        worker = get_current_worker()
-        register = self.register
-        while not worker.is_cancelled and register is not None:
-            try:
-                register.accessor.read()
-            except RuntimeError as e:
-                self.app.call_from_thread(self._update_push_single, e)
-            except da.ThreadInterrupted:
-                return
-            self.app.call_from_thread(self._update_push_single)
+    @work(exclusive=True, thread=True, group="initial_read")
+    def _initial_read(self, register: AccessorHolder) -> None:
+        try:
+            register.accessor.readLatest()
+        except RuntimeError as e:
+            self.call_from_thread(self._initial_read_done, register, e)
+            return
+        self.call_from_thread(self._initial_read_done, register, None)
 
-    def _update_push_single(self, exception: RuntimeError | None = None) -> None:
+    def _initial_read_done(self, register: AccessorHolder, exception: RuntimeError | None) -> None:
+        if register is not self.register:
+            return
         if exception is not None:
-            self.app.push_screen(ExceptionDialog("Error while reading from device", exception, True))
+            self.push_screen(ExceptionDialog("Error reading from device", exception, True))
             return
+        self.registerValueChanged = datetime.now()
+
+    def togglePinned(self, path: str) -> None:
+        """Add the register to the watch list, or remove it if it is pinned already."""
+        if path in self.watchList:
+            self.watchList = [pinned for pinned in self.watchList if pinned != path]
+        else:
+            self.watchList = self.watchList + [path]
+
+    def watch_watchList(self, watchList: list[str]) -> None:
+        self.watchValues = {path: frame for path, frame in self.watchValues.items() if path in watchList}
+        self._start_watch_acquisition()
 
-        now = datetime.now()
-        self.registerValueChanged = now
+    def watch_watchListActive(self, active: bool) -> None:
+        if active:
+            self._start_watch_acquisition()
+        else:
+            self._stop_watch_acquisition()
+
+    def _start_watch_acquisition(self) -> None:
+        """(Re)start acquiring all pinned registers in one worker, at the poll rate of the continuous read."""
+        self._stop_watch_acquisition()
+        if not self.watchListActive or len(self.watchList) == 0 or self.currentDevice is None or not self.isOpen:
+            return
+
+        import deviceaccess as da
+        from chai.Acquisition import WatchListAcquisition, LatestFrames
+        polled: dict[str, da.TransferElementBase] = {}
+        pushed: dict[str, da.TransferElementBase] = {}
+        self.watchRegisters = {}
+        try:
+            for path in self.watchList:
+                register = self._createAccessorHolder(path)
+                self.watchRegisters[path] = register
+                if not register.info.isReadable():
+                    continue
+                if da.AccessMode.wait_for_new_data in register.flags:
+                    pushed[path] = register.createReadAccessor(self.currentDevice)
+                else:
+                    polled[path] = register.createReadAccessor(self.currentDevice)
+        except RuntimeError as e:
+            self.push_screen(ExceptionDialog("Error reading from device", e, True))
+            return
+
+        latestFrames = LatestFrames()
+        history = self.historyStore
+        historyKeys = {path: self.historyKey(path) for path in self.watchList}
+
+        def onFrames(frames: dict[str, Frame]) -> None:
+            # a register which is also read continuously gets every frame from there, appending the watch list
+            # frames as well would interleave both in its history
+            continuousKey = self._continuousHistoryKey
+            for path, frame in frames.items():
+                if historyKeys[path] != continuousKey:
+                    history.append(historyKeys[path], frame)
+            latestFrames.put(frames)
+
+        def onError(exception: RuntimeError) -> None:
+            self.call_from_thread(self._watch_acquisition_error, acquisition, exception)
+
+        acquisition = WatchListAcquisition(polled, pushed, self.continuousPollHz, onFrames, onError)
+        self._watchAcquisition = acquisition
+        self._latestWatchFrames = latestFrames
+        self._watch_render_timer = self.set_interval(1 / self.renderHz, self._render_watch_frames)
+        self._watch_acquisition_loop(acquisition)
+
+    def _stop_watch_acquisition(self) -> None:
+        if self._watch_render_timer is not None:
+            self._watch_render_timer.stop()
+            self._watch_render_timer = None
+        if self._watchAcquisition is not None:
+            self._watchAcquisition.stop()
+            self._watchAcquisition = None
+        self._latestWatchFrames = None
+
+    @work(exclusive=True, thread=True, group="watch_list")
+    def _watch_acquisition_loop(self, acquisition: WatchListAcquisition) -> None:
+        acquisition.run()
+
+    def _render_watch_frames(self) -> None:
+        if self._latestWatchFrames is None:
+            return
+        frames = self._latestWatchFrames.take()
+        if len(frames) == 0:
+            return
+        self.watchValues.update(frames)
+        self.watchUpdated = set(frames)
+        self.watchValuesChanged = datetime.now()
+
+    def _watch_acquisition_error(self, acquisition: WatchListAcquisition, exception: RuntimeError) -> None:
+        if acquisition is not self._watchAcquisition:
+            return
+        self._stop_watch_acquisition()
+        self.watchListActive = False
+        self.push_screen(ExceptionDialog("Error while reading pinned registers", exception, True))
@@ -1,26 +1,180 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from MainApp import LayoutApp
 from textual.app import ComposeResult
-from textual.screen import Screen
-from textual.containers import Horizontal, Vertical, Container
-from textual.widgets import Header, Footer
-from textual import events
+from textual.containers import Vertical, Horizontal
+from textual.widgets import Label, Input, RadioSet, RadioButton
+from textual import on
 from textual_plotext import PlotextPlot
 
+from chai import Decimation
+from chai.Conversion import RawConverter
+from chai.Spectrum import SpectrumAnalyser
+from chai.Accessors import AccessorHolder
 
-class PlotScreen(Screen):
-    """Screen with a plot of current Register content."""
+import deviceaccess as da
+import numpy as np
+
+
+def parse_channels(text: str, nChannels: int) -> list[int]:
+    """Channels from e.g. "all", "0,2" or "1-3". Channels out of range are ignored."""
+    text = text.strip()
+    if text == "" or text == "all":
+        return list(range(nChannels))
+    channels: list[int] = []
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        try:
+            channels.extend(range(int(first), int(last or first) + 1))
+        except ValueError:
+            continue
+    return [channel for channel in dict.fromkeys(channels) if 0 <= channel < nChannels]
+
+
+class PlotView(Vertical):
+    """
+    Waveform or spectrum of the selected register. New values only mark the plot as outdated, it is redrawn at
+    redrawHz at most and only while shown. Traces are decimated to the width of the plot before they are handed to
+    plotext.
+
+    Spectra are averaged over the last frames of the continuous read, taken from the history, so frames acquired
+    between two redraws are included. Only the channels shown are transformed.
+    """
+    if TYPE_CHECKING:
+        app: LayoutApp
+
+    redrawHz: float = 10.  # building the plot in plotext takes tens of ms, independent of the number of samples
+
+    _register: AccessorHolder | None = None
+    _converter: RawConverter | None = None
+    _outdated: bool = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._analyser = SpectrumAnalyser()
 
     def compose(self) -> ComposeResult:
-        yield Header()
-        yield PlotextPlot()
-        yield Footer()
+        yield Horizontal(
+            Label("Channels", id="label_plot_channels"),
+            Input(value="all", placeholder="all, 0,2 or 1-3", id="input_plot_channels", compact=True),
+            RadioSet(
+                RadioButton("Waveform", value=True, id="radio_plot_waveform"),
+                RadioButton("Spectrum", id="radio_plot_spectrum"),
+                compact=True,
+                id="radio_set_plot_mode"),
+            Label("Average", id="label_spectrum_averages"),
+            Input(value="1", type="integer", id="input_spectrum_averages", compact=True,
+                  tooltip="Number of frames the spectrum is averaged over"),
+            RadioSet(
+                RadioButton("Min/max", value=True, id="radio_decimation_minmax"),
+                RadioButton("LTTB", id="radio_decimation_lttb"),
+                compact=True,
+                id="radio_set_decimation"),
+            classes="small_row",
+            id="plot_controls"
+        )
+        yield PlotextPlot(id="register_plot")
 
     def on_mount(self) -> None:
-        plt = self.query_one(PlotextPlot).plt
-        y = plt.sin()
-        plt.scatter(y)
-        plt.title("Scatter Plot")  # to apply a title
-
-    def on_key(self, event: events.Key) -> None:
-        print(event.key)
-        if event.name == "escape":
-            self.app.pop_screen()
+        self.watch(self.app, "registerValueChanged", lambda changed: self.invalidate())
+        self.watch(self.app, "register", lambda register: self.invalidate())
+        self.watch(self.app, "channel", lambda channel: self.invalidate())
+        self.set_interval(1 / self.redrawHz, self._redraw)
+
+    def invalidate(self) -> None:
+        self._outdated = True
+
+    def on_resize(self) -> None:
+        self.invalidate()
+
+    @on(Input.Changed, "#input_plot_channels")
+    @on(Input.Changed, "#input_spectrum_averages")
+    @on(RadioSet.Changed, "#radio_set_decimation")
+    @on(RadioSet.Changed, "#radio_set_plot_mode")
+    def _settings_changed(self) -> None:
+        self.invalidate()
+
+    def _numericRegister(self) -> AccessorHolder | None:
+        register = self.app.register
+        if register is not self._register:
+            self._register = register
+            self._converter = None
+            if register is not None and da.AccessMode.raw in register.flags and \
+                    isinstance(register.accessor, da.TwoDRegisterAccessor):
+                self._converter = RawConverter(register.accessor, register.info,
+                                               register.createReadAccessor(self.app.currentDevice))
+        if register is None or not isinstance(register.accessor, da.TwoDRegisterAccessor):
+            return None
+        return register
+
+    def _channels(self, register: AccessorHolder) -> list[int]:
+        return parse_channels(self.query_one("#input_plot_channels", Input).value, register.info.getNumberOfChannels())
+
+    def _traces(self) -> list[tuple[int, np.ndarray]]:
+        """Cooked values of the channels to show."""
+        register = self._numericRegister()
+        if register is None:
+            return []
+
+        elements = np.arange(register.info.getNumberOfElements())
+        traces = []
+        for channel in self._channels(register):
+            if self._converter is not None:
+                values = self._converter.cooked(channel, elements)
+            else:
+                values = np.asarray(register.accessor[channel])
+            if np.issubdtype(values.dtype, np.number) or values.dtype == bool:
+                traces.append((channel, values.astype(np.float64, copy=False)))
+        return traces
+
+    def _spectra(self) -> list[tuple[int, np.ndarray]]:
+        """Spectra in dB of the channels to show, bins are in units of the sample rate."""
+        register = self._numericRegister()
+        if register is None or register.info.getNumberOfElements() < 2:
+            return []
+        channels = self._channels(register)
+        if len(channels) == 0:
+            return []
+        try:
+            averages = max(int(self.query_one("#input_spectrum_averages", Input).value), 1)
+        except ValueError:
+            averages = 1
+
+        history = self.app.historyStore.get(self.app.historyKey(self.app.registerPath)) \
+            if self.app.continuousRead and self.app.registerPath is not None else None
+        if history is not None and len(history) > 0:
+            frames = history.frames(averages, channels)[0]
+        else:
+            # single reads are not part of the history
+            frames = np.array([np.asarray(register.accessor[channel]) for channel in channels])[np.newaxis]
+        if not np.issubdtype(frames.dtype, np.number):
+            return []
+        if self._converter is not None:
+            frames = self._converter.cookedValues(frames)
+        return list(zip(channels, self._analyser.spectra(frames)))
+
+    def _redraw(self) -> None:
+        if not self._outdated or not self.screen.is_current:
+            return
+        self._outdated = False
+        plot = self.query_one("#register_plot", PlotextPlot)
+        plt = plot.plt
+        plt.clear_data()
+        spectrum = self.query_one("#radio_plot_spectrum", RadioButton).value
+        traces = self._spectra() if spectrum else self._traces()
+        lttb = self.query_one("#radio_decimation_lttb", RadioButton).value
+        # with braille markers a cell holds two points horizontally
+        width = max(plot.size.width, 10)
+        for channel, values in traces:
+            if lttb:
+                x, y = Decimation.lttb(values, 2 * width)
+            else:
+                x, y = Decimation.minmax(values, width)
+            if spectrum:
+                x = x / self._register.info.getNumberOfElements()
+            plt.plot(x.tolist(), y.tolist(), marker="braille", label=f"ch {channel}" if len(traces) > 1 else None)
+        plt.title(self.app.registerPath or "")
+        plt.xlabel("frequency / sample rate" if spectrum else "element")
+        plt.ylabel("dB" if spectrum else "")
+        plot.refresh()
@@ -0,0 +1,174 @@
+"""
+Opt-in profiling, enabled with the environment variable CHAI_PROFILE or the --profile command line option of Chai.py.
+The hot paths decorated with timed() are timed on every call, cProfile and tracemalloc run for a fixed window after
+the start. A report is written to a file when Chai exits.
+
+timed() decides at decoration time, so profiling must be enabled before the views are imported. Without profiling
+the functions are returned unchanged and cost nothing.
+"""
+from __future__ import annotations
+import atexit
+import functools
+import io
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from chai.Timing import Histogram
+
+if TYPE_CHECKING:
+    import cProfile
+
+
+class _Profiler:
+    path: str
+    window: float  # seconds of cProfile and tracemalloc after the start
+
+    def __init__(self, path: str, window: float):
+        self.path = path
+        self.window = window
+        self.started = datetime.now()
+        self.timers: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._windowEnd = time.monotonic() + window
+        self._profile: cProfile.Profile | None = None
+        self._profileReport = ""
+        self._memoryReport = ""
+
+    def startWindow(self) -> None:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stopWindow(self) -> None:
+        """Stop cProfile and tracemalloc and keep their results. Must be called from the thread which started them,
+        cProfile only covers that thread."""
+        if self._profile is None:
+            return
+        import pstats
+        import tracemalloc
+        self._profile.disable()
+        output = io.StringIO()
+        pstats.Stats(self._profile, stream=output).sort_stats("cumulative").print_stats(40)
+        self._profileReport = output.getvalue()
+        self._profile = None
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        lines = [f"current {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB", ""]
+        lines += [str(statistic) for statistic in snapshot.statistics("lineno")[:25]]
+        self._memoryReport = "\n".join(lines)
+
+    def remainingWindow(self) -> float:
+        return max(self._windowEnd - time.monotonic(), 0.)
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = Histogram()
+            histogram.add(seconds)
+
+    def report(self) -> str:
+        lines = [
+            f"Chai profile {self.started:%Y-%m-%d %H:%M:%S} to {datetime.now():%Y-%m-%d %H:%M:%S}",
+            f"host {socket.gethostname()}, {platform.platform()}, Python {platform.python_version()}",
+            f"command {' '.join(sys.argv)}",
+            "",
+            f"{'timer':<40} {'count':>8} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10} {'total s':>10}",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.timers.items()):
+                lines.append(f"{name:<40} {histogram.count:>8} {histogram.mean * 1000:>10.3f} "
+                             f"{histogram.percentile(50) * 1000:>10.3f} {histogram.percentile(99) * 1000:>10.3f} "
+                             f"{histogram.max * 1000:>10.3f} {histogram.total:>10.3f}")
+        lines += ["", f"cProfile of the first {self.window:g} s", self._profileReport or "(not finished)",
+                  f"tracemalloc of the first {self.window:g} s", self._memoryReport or "(not finished)", ""]
+        return "\n".join(lines)
+
+    def write(self) -> None:
+        self.stopWindow()
+        try:
+            with open(self.path, "w") as file:
+                file.write(self.report())
+        except OSError as e:
+            print(f"Could not write the profile to {self.path}: {e}", file=sys.stderr)
+            return
+        print(f"Profile written to {self.path}", file=sys.stderr)
+
+
+_profiler: _Profiler | None = None
+
+
+def window_from_environment(default: float = 30.) -> float:
+    """The window set by CHAI_PROFILE_WINDOW in seconds, default if it is unset or not a number."""
+    value = os.environ.get("CHAI_PROFILE_WINDOW")
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Ignoring CHAI_PROFILE_WINDOW={value!r}, not a number of seconds. Profiling for {default:g} s.",
+              file=sys.stderr)
+        return default
+
+
+def enable(path: str | None = None, window: float = 30.) -> None:
+    """Start profiling. The report is written to path, by default chai_profile_<timestamp>.txt in the working
+    directory."""
+    global _profiler
+    if _profiler is not None:
+        return
+    if path is None:
+        path = f"chai_profile_{datetime.now():%Y%m%d_%H%M%S}.txt"
+    _profiler = _Profiler(os.path.abspath(path), window)
+    _profiler.startWindow()
+    atexit.register(_profiler.write)
+
+
+def enable_from_environment() -> None:
+    """Enable profiling if CHAI_PROFILE is set, to the report path or 1. CHAI_PROFILE_WINDOW sets the window."""
+    path = os.environ.get("CHAI_PROFILE")
+    if path is None or path in ("", "0"):
+        return
+    enable(None if path == "1" else path, window_from_environment())
+
+
+def active() -> bool:
+    return _profiler is not None
+
+
+def remaining_window() -> float:
+    return _profiler.remainingWindow() if _profiler is not None else 0.
+
+
+def stop_window() -> None:
+    if _profiler is not None:
+        _profiler.stopWindow()
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator measuring the duration of each call under name, if profiling is enabled."""
+    def decorator(function: Callable) -> Callable:
+        profiler = _profiler
+        if profiler is None:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,258 @@
+"""
+Recording of register frames to disk. A recording is a directory with a meta.json and segment files, each segment is
+a plain .npy file of a structured array with one record per frame:
+
+    segment = np.load("recording/segment_00000.npy", mmap_mode="r")
+    segment["data"]       # (frames, channels, elements), as transferred (raw if the register supports it)
+    segment["timestamp"]  # acquisition time, seconds since the epoch
+    segment["sequence"], segment["version"]
+
+Segments are written by a background thread. The frame count in the header of the current segment is updated
+regularly, so a segment can be read while it is still being written. A copy of the map file of the device is kept in
+the recording, so it can be replayed through a dummy device (see chai.Replay).
+"""
+from __future__ import annotations
+import bisect
+import json
+import os
+import queue
+import re
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import numpy as np
+if TYPE_CHECKING:
+    from chai.Acquisition import Frame
+
+SEGMENT_PATTERN = "segment_{:05d}.npy"
+
+
+def frame_dtype(dataType: np.dtype, channels: int, elements: int, versionLength: int = 64) -> np.dtype:
+    return np.dtype([("timestamp", "<f8"), ("sequence", "<u8"), ("version", f"<U{versionLength}"),
+                     ("data", dataType, (channels, elements))])
+
+
+def version_length(version: str) -> int:
+    """Length of the version field for a recording starting with this version. Version numbers grow slowly with the
+    versions issued by DeviceAccess, twice the length of the first one leaves ample room."""
+    return max(2 * len(version), 64)
+
+
+def npy_header(dtype: np.dtype, count: int) -> bytes:
+    """Header of a .npy file (format 1.0) with one dimension of count records. Its length does not depend on count,
+    so it can be rewritten in place when frames have been appended."""
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (np.lib.format.dtype_to_descr(dtype), count)
+    # reserve room for up to 21 digits
+    header += " " * (21 - len(str(count)))
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def recording_name(deviceAlias: str | None, registerPath: str) -> str:
+    register = re.sub(r"[^A-Za-z0-9_.-]+", "_", registerPath).strip("_")
+    return f"{deviceAlias or 'device'}_{register}_{datetime.now():%Y%m%d_%H%M%S}.chairec"
+
+
+class Recorder:
+    """
+    Writes frames of one register to a recording directory from a background thread. put() and close() never block:
+    if the writer cannot keep up, frames are queued up to queueBytes of data, further frames are dropped and counted.
+    If writing fails, error is set and the recording stops.
+    """
+    directory: str
+    recorded: int
+    dropped: int
+    segmentBytes: int
+    error: Exception | None
+
+    def __init__(self, directory: str, meta: dict, mapFile: str | None = None, queueBytes: int = 64 * 1024 * 1024,
+                 segmentBytes: int = 64 * 1024 * 1024, headerInterval: float = 1.):
+        self.directory = directory
+        self.recorded = 0
+        self.dropped = 0
+        self.segmentBytes = segmentBytes
+        self.error = None
+        self._dtype: np.dtype | None = None  # taken from the first frame
+        self._headerInterval = headerInterval
+        # bounded by the data queued rather than the frame count, frames range from bytes to megabytes
+        self._queue: queue.Queue[Frame | None] = queue.Queue()
+        self._queueBytes = queueBytes
+        self._queuedBytes = 0
+        self._queueLock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+
+        os.makedirs(directory)
+        meta = dict(meta, created=datetime.now().isoformat(), segmentPattern=SEGMENT_PATTERN, mapFile=None)
+        if mapFile is not None and os.path.isfile(mapFile):
+            meta["mapFile"] = os.path.basename(mapFile)
+            shutil.copyfile(mapFile, os.path.join(directory, meta["mapFile"]))
+        with open(os.path.join(directory, "meta.json"), "w") as file:
+            json.dump(meta, file, indent=1)
+
+        # not a daemon, so frames still queued are written when Chai exits
+        self._thread = threading.Thread(target=self._run, name="Recorder")
+        self._thread.start()
+
+    def put(self, frame: Frame) -> None:
+        if self._closed or frame.data is None:
+            return
+        size = frame.data.nbytes
+        with self._queueLock:
+            # a single frame is accepted even if it exceeds the limit, so large registers can be recorded at all
+            if self._queuedBytes > 0 and self._queuedBytes + size > self._queueBytes:
+                self.dropped += 1
+                return
+            self._queuedBytes += size
+        self._queue.put_nowait(frame)
+
+    def close(self) -> None:
+        """Stop recording. Frames queued so far are still written, close() does not wait for it."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        # wakes the writer up once the frames queued before are written
+        self._queue.put_nowait(None)
+
+    def _run(self) -> None:
+        segment = -1
+        file = None
+        count = 0
+        lastHeader = time.monotonic()
+        try:
+            while True:
+                try:
+                    frame = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stop.is_set():
+                        break
+                    continue
+                if frame is None:
+                    break
+                with self._queueLock:
+                    self._queuedBytes -= frame.data.nbytes
+                version = str(frame.version) if frame.version is not None else ""
+                if self._dtype is None:
+                    dataType = frame.data.dtype
+                    if dataType.kind == "U":
+                        # the length of strings varies from frame to frame, longer ones are truncated
+                        dataType = np.dtype(f"<U{max(dataType.itemsize // 4, 256)}")
+                    self._dtype = frame_dtype(dataType, *frame.data.shape, version_length(version))
+                    record = np.zeros((), dtype=self._dtype)
+                if file is None or (count + 1) * self._dtype.itemsize > self.segmentBytes and count > 0:
+                    if file is not None:
+                        self._finishSegment(file, count)
+                    segment += 1
+                    count = 0
+                    file = open(os.path.join(self.directory, SEGMENT_PATTERN.format(segment)), "wb")
+                    file.write(npy_header(self._dtype, 0))
+
+                record["timestamp"] = frame.timestamp.timestamp()
+                record["sequence"] = frame.sequence
+                record["version"] = version
+                record["data"] = frame.data
+                file.write(record.tobytes())
+                count += 1
+                self.recorded += 1
+
+                if time.monotonic() - lastHeader > self._headerInterval:
+                    self._writeHeader(file, count)
+                    lastHeader = time.monotonic()
+        except Exception as e:
+            # e.g. a full disk, or a frame not matching the record of the first one
+            self.error = e
+            # further frames are ignored by put()
+            self._closed = True
+        finally:
+            if file is not None:
+                try:
+                    self._finishSegment(file, count)
+                except OSError as e:
+                    self.error = self.error or e
+
+    def _writeHeader(self, file, count: int) -> None:
+        file.flush()
+        position = file.tell()
+        file.seek(0)
+        file.write(npy_header(self._dtype, count))
+        file.seek(position)
+        file.flush()
+
+    def _finishSegment(self, file, count: int) -> None:
+        try:
+            self._writeHeader(file, count)
+        finally:
+            file.close()
+
+
+def list_segments(directory: str) -> list[str]:
+    """Paths of all segment files of a recording, in order."""
+    segments = []
+    while os.path.exists(path := os.path.join(directory, SEGMENT_PATTERN.format(len(segments)))):
+        segments.append(path)
+    return segments
+
+
+class Recording:
+    """
+    Read access to a recording. Segments are memory-mapped, so opening does not depend on the size of the recording
+    and only the frames accessed are read from disk.
+    """
+    directory: str
+    meta: dict
+    registerPath: str
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as file:
+            self.meta = json.load(file)
+        self.registerPath = self.meta["registerPath"]
+        self._segments = [np.load(path, mmap_mode="r") for path in list_segments(directory)]
+        # index of the first frame of each segment
+        self._starts = [0]
+        for segment in self._segments:
+            self._starts.append(self._starts[-1] + len(segment))
+        if len(self) == 0:
+            raise ValueError(f"The recording {directory} does not contain any frames.")
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def _locate(self, index: int) -> tuple[np.ndarray, int]:
+        segment = bisect.bisect_right(self._starts, index) - 1
+        return self._segments[segment], index - self._starts[segment]
+
+    def data(self, index: int) -> np.ndarray:
+        """(channels, elements) content of the frame, as recorded."""
+        segment, offset = self._locate(index)
+        return segment["data"][offset]
+
+    def timestamp(self, index: int) -> float:
+        segment, offset = self._locate(index)
+        return float(segment["timestamp"][offset])
+
+    def indexAt(self, timestamp: float) -> int:
+        """Index of the last frame acquired at or before the timestamp. Only log(n) frames are accessed."""
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) <= timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return max(low - 1, 0)
+
+    @property
+    def duration(self) -> float:
+        return self.timestamp(len(self) - 1) - self.timestamp(0)
+
+    @property
+    def mapFile(self) -> str | None:
+        if self.meta.get("mapFile") is None:
+            return None
+        return os.path.join(os.path.abspath(self.directory), self.meta["mapFile"])
@@ -1,4 +1,3 @@
-from collections import deque
 from datetime import datetime
 from typing import TYPE_CHECKING
 
@@ -10,28 +9,67 @@ if TYPE_CHECKING:
 from chai.Utils import InputWithEnterAction
 from textual.app import ComposeResult
 from textual.containers import Horizontal, Vertical, Container
-from textual.widgets import Button, Label, Tree, Input, Checkbox, Button, Input, Sparkline
+from textual.widgets import Button, Label, Tree, Input, Checkbox, Button, Input, Sparkline, DataTable
 from textual import log, on
 from textual.reactive import Reactive
 from textual.validation import Validator, ValidationResult
 from textual.events import Click
 from textual.screen import ModalScreen
+from textual.timer import Timer
 
-from chai.DataView import RegisterInfo, RegisterValueField
+from chai.DataView import RegisterInfo, RegisterValueField, VirtualContentTable
 from chai.ActionsView import ActionsView
+from chai.ReplayView import ReplayControls
 
 from chai import Utils
+from chai import CatalogueCache
+from chai import Profiling
 
 import deviceaccess as da
 import re
 
-from chai.Utils import AccessorHolder
+
+def build_register_index(register_names: list[str]) -> dict:
+    """
+    Trie of the register names, used to populate the tree lazily. Keys are (path segment, is leaf), values are the
+    next level for branches and the full register path for leaves. Insertion order of the names is preserved.
+    """
+    index: dict = {}
+    for name in register_names:
+        segments = name.split('/')[1:]
+        level = index
+        for segment in segments[:-1]:
+            level = level.setdefault((segment, False), {})
+        level[(segments[-1], True)] = name
+    return index
+
+
+def can_narrow_filter(previous: str, pattern: str) -> bool:
+    """
+    Whether every name matched by pattern is also matched by previous, so filtering can start from the previous
+    result. This holds if pattern only appends atoms to previous: no quantifiers or alternations, and previous does
+    not end in something the appended characters could become part of (escape, backreference, repetition count).
+    """
+    if previous == "" or not pattern.startswith(previous):
+        return False
+    if re.search(r"[*+?{}|()\[\]\\]", pattern[len(previous):]):
+        return False
+    return not re.search(r"\\\d*$|\{[\d,]*$", previous)
 
 
 class RegisterTree(Tree):
 
-    _register_names = []
+    _register_names: list[str] = []
     regExPattern: Reactive[str] = Reactive("")
+
+    # typing in the filter is debounced by this delay in seconds
+    filterDelay: float = 0.25
+    _filterTimer: Timer | None = None
+    # last filter result, to narrow down from when the pattern is extended
+    _filteredPattern: str = ""
+    _filteredNames: list[str] = []
+    # filter results with more matches stay collapsed, expanding all of them would create every node
+    autoExpandLimit: int = 500
     if TYPE_CHECKING:
         app: LayoutApp
 
@@ -39,63 +77,120 @@ class RegisterTree(Tree):
         self.root.expand()
         self.show_root = False
 
-        self.watch(self.app, "currentDevice", lambda device: self.on_device_changed(device))
+        # the tree is built when it is shown, switching devices on the device screen does not wait for it
+        Utils.watch_when_shown(self, self.app, "currentDevice", lambda device: self.on_device_changed(device))
 
     def on_device_changed(self, device: da.Device) -> None:
         self.clear()
         if device is None:
             return
 
-        register_names = []
-        cat = device.getRegisterCatalogue()
-        for reg in cat:
-            register_names.append(str(reg.getRegisterName()))
-        for reg in cat.hiddenRegisters():
-            name: str = reg.getRegisterName()
-            if name.startswith("/DUMMY_INTERRUPT_"):
-                register_names.append(str(name))
+        pooled = self.app.devicePool.peek(self.app.deviceAlias)
+        if pooled is not None and pooled.device is device and pooled.registerNames is not None:
+            # switching back to a device of the pool
+            self._setRegisterNames(pooled.registerNames)
+            return
+
+        cdd = self.app.deviceCdd
+        registers = CatalogueCache.load_snapshot(cdd, self.app.dmapFilePath) if cdd is not None else None
+        if registers is not None:
+            # show the cached catalogue right away, the device is asked in the background
+            self._setRegisterNames([register["name"] for register in registers])
+            self._revalidateCatalogue(device, cdd, self.app.dmapFilePath, registers)
+            return
+
+        registers = CatalogueCache.snapshot_catalogue(device.getRegisterCatalogue())
+        if cdd is not None:
+            CatalogueCache.store_snapshot(cdd, self.app.dmapFilePath, registers)
+        self._setRegisterNames([register["name"] for register in registers])
+
+    def _setRegisterNames(self, register_names: list[str]) -> None:
+        pooled = self.app.devicePool.peek(self.app.deviceAlias)
+        if pooled is not None and pooled.device is self.app.currentDevice:
+            pooled.registerNames = register_names
         self._register_names = register_names
+        self._filteredPattern = ""
+        self._filteredNames = register_names
         self.updateTree()
 
+    def _revalidateCatalogue(self, device: da.Device, cdd: str, dmapPath: str | None, cached: list[dict]) -> None:
+        """Compare the cached catalogue with the one of the device, on the device worker, so it does not run
+        concurrently with opening or closing the device."""
+        entry = self.app.devicePool.entryOf(device)
+        if entry is None:
+            return
+
+        def job() -> None:
+            try:
+                registers = CatalogueCache.snapshot_catalogue(device.getRegisterCatalogue())
+            except RuntimeError:
+                return
+            if registers == cached:
+                return
+            CatalogueCache.store_snapshot(cdd, dmapPath, registers)
+            self.app.call_from_thread(self._catalogueChanged, device, registers)
+
+        entry.worker.submit(job)
+
+    def _catalogueChanged(self, device: da.Device, registers: list[dict]) -> None:
+        if device is not self.app.currentDevice:
+            return
+        self._setRegisterNames([register["name"] for register in registers])
+
+    @Profiling.timed("RegisterTree.updateTree")
     def updateTree(self) -> None:
         self.clear()
         if self.app.currentDevice is None:
             return
 
+        names = self._filterNames(self.regExPattern)
         if self.app.sortedRegisters:
-            self._register_names.sort()
-
-        for reg_name in self._register_names:
-            match = re.search(self.regExPattern, reg_name, flags=re.IGNORECASE)
-            if len(self.regExPattern) > 0 and not match:
-                continue
-            split_name = reg_name.split('/')[1:]
-            current_level = self.root
-            while len(split_name) > 1:
-                node_added = False
-                for child in current_level.children:
-                    if str(child.label) == split_name[0]:
-                        current_level = child
-                        node_added = True
-                        break
-                if not node_added:
-                    current_level = current_level.add(split_name[0])
-                split_name = split_name[1:]
-
-            current_level.add_leaf(split_name[0])
+            names = sorted(names)
+
+        # only the top level is created, deeper levels are added when their parent is expanded
+        self._populate(self.root, build_register_index(names))
+
+    def _filterNames(self, pattern: str) -> list[str]:
+        if pattern == "":
+            names = self._register_names
+        else:
+            candidates = self._filteredNames if can_narrow_filter(self._filteredPattern, pattern) \
+                else self._register_names
+            search = re.compile(pattern, flags=re.IGNORECASE).search
+            names = [name for name in candidates if search(name)]
+        self._filteredPattern = pattern
+        self._filteredNames = names
+        return names
+
+    def _populate(self, node: "TreeNode", level: dict) -> None:
+        for (segment, isLeaf), content in level.items():
+            if isLeaf:
+                node.add_leaf(segment, data=content)
+            else:
+                node.add(segment, data=content)
+
+    def on_tree_node_expanded(self, expanded: Tree.NodeExpanded) -> None:
+        node = expanded.node
+        if isinstance(node.data, dict) and len(node.children) == 0:
+            self._populate(node, node.data)
+
+    def expandAll(self) -> None:
+        def expand(node: "TreeNode") -> None:
+            if isinstance(node.data, dict) and len(node.children) == 0:
+                self._populate(node, node.data)
+            node.expand()
+            for child in node.children:
+                expand(child)
+        expand(self.root)
 
     def on_tree_node_selected(self, selected):
         if selected.node.is_root:
             return
 
-        currentRegisterPath = f"/{selected.node.label}"
-        parent = selected.node.parent
-        while not parent.is_root:
-            currentRegisterPath = f"/{parent.label}{currentRegisterPath}"
-            parent = parent.parent
-
-        if currentRegisterPath not in self._register_names:
+        # leaves carry their register path, branches the next level of the index
+        if not isinstance(selected.node.data, str):
             return
+        currentRegisterPath = selected.node.data
 
         if self.app.currentDevice is None:
             return
@@ -122,9 +217,16 @@ class RegisterTree(Tree):
             yield from self.walk(child)
 
     def watch_regExPattern(self, value: str) -> None:
-        if self.app.currentDevice is None:
-            return
-        self.on_device_changed(self.app.currentDevice)
+        # filtering works on the cached names only, and is applied once typing paused
+        if self._filterTimer is not None:
+            self._filterTimer.stop()
+        self._filterTimer = self.set_timer(self.filterDelay, self._applyFilter)
+
+    def _applyFilter(self) -> None:
+        self._filterTimer = None
+        self.updateTree()
+        if len(self.regExPattern) > 0 and len(self._filteredNames) <= self.autoExpandLimit:
+            self.expandAll()
 
 
 class MetaPopUpScreen(ModalScreen):
@@ -144,9 +246,6 @@ class RegisterView(Vertical):
     if TYPE_CHECKING:
         app: LayoutApp
 
-    _avg_update_interval_list: deque = deque(maxlen=10)
-    _registerValueQueue: deque = deque(maxlen=80)
-
     def compose(self) -> ComposeResult:
         yield Horizontal(
             Container(
@@ -173,27 +272,34 @@ class RegisterView(Vertical):
                     ),
                     Button("Read", disabled=True, id="btn_read"),
                     Button("Write", disabled=True, id="btn_write"),
+                    Button("Pin", disabled=True, id="btn_pin", tooltip="Add the register to the watch list"),
                     id="content_action_buttons"
                 ),
                 Container(
                     Label("(placeholder)", id="label_ctn_pollread"),
                     Checkbox("",  compact=True, id="checkbox_cont_pollread", value=False, disabled=True),
+                    Label("Record", id="label_record"),
+                    Checkbox("", compact=True, id="checkbox_record", value=False, disabled=True,
+                             tooltip="Write every frame of the continuous read to a recording directory"),
                     classes="small_row",
                 ),
                 id="register_content",
                 classes="right_pane"),
         )
-        yield Sparkline(id="register_value_sparkline",
-                        data=self._registerValueQueue,
-                        summary_function=max)
+        yield Sparkline(id="register_value_sparkline", data=[], summary_function=max)
         yield Container(
             Label("(placeholder)", id="label_last_poll_update"),
 
             Label("(never)", id="last_update_time"),
-            Label("Avg. update Δ", id="label_avg_update_interval"),
+            Label("Update Δ (median)", id="label_avg_update_interval"),
             Label("(n/a)", id="update_interval"),
+            Label("Coalesced", id="label_coalesced_frames"),
+            Label("0", id="coalesced_frames"),
+            Label("Recorded", id="label_recorded_frames"),
+            Label("0", id="recorded_frames"),
             classes="poll_status_bar"
         )
+        yield ReplayControls(id="replay_controls")
 
     def on_mount(self, event: Mount) -> None:
         self.query_one("#btn_read", Button).disabled = not self.app.enableReadButton
@@ -203,9 +309,14 @@ class RegisterView(Vertical):
         self.watch(self.app, "continuousRead", lambda cr: self._update_read_write_btn_status())
         self.watch(self.app, "isOpen", lambda cr: self._update_read_write_btn_status())
         self.watch(self.app, "register", lambda cr: self._update_read_write_btn_status())
+        self.watch(self.app, "register", lambda register: self._update_pin_btn())
+        self.watch(self.app, "watchList", lambda watchList: self._update_pin_btn())
+        self.watch(self.app, "recording", lambda recording: self._update_record_checkbox())
         self.watch(self.app, "sortedRegisters", lambda cr: self.RefreshTree())
         self.watch(self.app, "channel", lambda channel: self.on_channel_changed(channel))
-        self.watch(self.app, "registerValueChanged", lambda old, new: self.on_registerValueChanged(old, new))
+        self.watch(self.app, "register", lambda register: self.updateSparkline())
+        Utils.watch_when_shown(self, self.app, "registerValueChanged",
+                               lambda old, new: self.on_registerValueChanged(old, new))
         self.watch(self.app, "register", lambda register: self.update())
         self.watch(self.app, "isOpen", lambda open: self.update())
         self.update()
@@ -218,29 +329,42 @@ class RegisterView(Vertical):
         self.query_one("#checkbox_cont_pollread", Checkbox).disabled = not self.app.enableReadButton
         self.query_one("#checkbox_cont_pollread", Checkbox).value = False
         self.app.continuousRead = False
+        self.query_one("#checkbox_record", Checkbox).disabled = not self.app.enableReadButton
+        self.query_one("#checkbox_record", Checkbox).value = False
+        self.app.recording = False
 
     def on_registerValueChanged(self, old_time: datetime, new_time: datetime) -> None:
         self.query_one("#last_update_time", Label).update(str(new_time))
+        for labelId in ["#update_interval", "#label_avg_update_interval", "#coalesced_frames", "#label_coalesced_frames"]:
+            self.query_one(labelId, Label).display = self.app.continuousRead
         if not self.app.continuousRead:
-            self.query_one("#update_interval", Label).display = False
-            self.query_one("#label_avg_update_interval", Label).display = False
             return
+        self.query_one("#coalesced_frames", Label).update(str(self.app.coalescedFrames))
+        self._updateRecorderStatus()
+        timing = self.app.readTiming
+        if timing is not None:
+            # interval between the reads, independent of how often the UI shows them
+            interval = timing.percentile("interval", 50)
+            self.query_one("#update_interval", Label).update(f"{interval * 1000:.3g} ms")
+        self.updateSparkline()
+
+    def _update_record_checkbox(self) -> None:
+        # the app stops recording e.g. if the directory cannot be created
+        self.query_one("#checkbox_record", Checkbox).value = self.app.recording
+
+    def _updateRecorderStatus(self) -> None:
+        recorder = self.app.recorder
+        for labelId in ["#recorded_frames", "#label_recorded_frames"]:
+            self.query_one(labelId, Label).display = recorder is not None
+        if recorder is None:
+            return
+        if recorder.error is not None:
+            status = f"failed: {recorder.error}"
+        elif recorder.dropped > 0:
+            status = f"{recorder.recorded} ({recorder.dropped} dropped)"
         else:
-            self.query_one("#update_interval", Label).display = True
-            self.query_one("#label_avg_update_interval", Label).display = True
-        if old_time is not None:
-            self._avg_update_interval_list.append((new_time - old_time).total_seconds())
-            avg = sum(self._avg_update_interval_list) / len(self._avg_update_interval_list)
-            self.query_one("#update_interval", Label).update(f"{round(avg * 1000)} ms")
-            sparkline = self.query_one("#register_value_sparkline", Sparkline)
-            table = self.query_one("#register_value_field", RegisterValueField)
-            if (len(self._registerValueQueue) == self._registerValueQueue.maxlen):
-                self._registerValueQueue.popleft()
-                # don't add duplicate values
-                return
-            self._registerValueQueue.append(table.currentlySelectedValue())
-
-            sparkline.refresh()
+            status = str(recorder.recorded)
+        self.query_one("#recorded_frames", Label).update(status)
 
     def RefreshTree(self) -> None:
         rt = self.query_one(RegisterTree)
@@ -248,6 +372,7 @@ class RegisterView(Vertical):
 
     def on_channel_changed(self, channel: int) -> None:
         self.query_one("#channel_input", Input).value = str(channel)
+        self.updateSparkline()
 
     def on_input_submitted(self, change: Input.Submitted) -> None:
         if self.app.register is None:
@@ -281,15 +406,28 @@ class RegisterView(Vertical):
                 self.query_one("#channelNumberLabel", Label).update(
                     f"Ch. (0-{self.app.register.info.getNumberOfChannels()-1}):")
 
+    def _update_pin_btn(self) -> None:
+        button = self.query_one("#btn_pin", Button)
+        button.disabled = self.app.registerPath is None
+        pinned = self.app.registerPath in self.app.watchList
+        button.label = "Unpin" if pinned else "Pin"
+        button.tooltip = "Remove the register from the watch list" if pinned else "Add the register to the watch list"
+
+    @on(Button.Pressed, "#btn_pin")
+    def _pressed_pin(self) -> None:
+        if self.app.registerPath is not None:
+            self.app.togglePinned(self.app.registerPath)
+
     @on(Button.Pressed, "#btn_collapse")
     def _pressed_collapse(self) -> None:
         rt = self.query_one(RegisterTree)
-        rt._tree.root.collapse_all()
+        rt.root.collapse_all()
+        rt.root.expand()
 
     @on(Button.Pressed, "#btn_expand")
     def _pressed_expand(self) -> None:
         rt = self.query_one(RegisterTree)
-        rt._tree.root.expand_all()
+        rt.expandAll()
 
     @on(Input.Changed, "#regex_input")
     def _regex_changed(self, event: Input.Changed) -> None:
@@ -301,13 +439,12 @@ class RegisterView(Vertical):
         rt = self.query_one(RegisterTree)
         inp = self.query_one("#regex_input", InputWithEnterAction)
         rt.regExPattern = inp.value
-        self._pressed_expand()
 
     @on(Click)
     def _on_right_click(self, event: Click) -> None:
         if event.button == 3 and isinstance(event.widget, Tree) and "node" in event.style.meta:
             tree = self.query_one(RegisterTree)
-            for node in tree.walk(tree._tree.root):
+            for node in tree.walk(tree.root):
                 n: TreeNode = node
 
                 if n._id == event.style.meta["node"]:
@@ -324,21 +461,33 @@ class RegisterView(Vertical):
     @on(Checkbox.Changed, "#checkbox_cont_pollread")
     def on_checkbox_changed(self, changed: Checkbox.Changed):
         self.app.continuousRead = changed.control.value
-        assert self._registerValueQueue.maxlen is not None
-        self._registerValueQueue.clear()
-        self._registerValueQueue.extend([0] * self._registerValueQueue.maxlen)
+
+    @on(Checkbox.Changed, "#checkbox_record")
+    def _record_changed(self, changed: Checkbox.Changed):
+        self.app.recording = changed.control.value
+        self._updateRecorderStatus()
 
     def updateSparkline(self) -> None:
-        if self.app.register is None:
-            return
-        if self.app.registerValue is None:
-            return
-        if not self.app.continuousRead:
-            return
-        self._registerValueQueue.append(self.app.registerValue)
+        """Show the history of the element under the cursor, one value per cell."""
         sparkline = self.query_one("#register_value_sparkline", Sparkline)
-        sparkline.data = list(self._registerValueQueue)
-        sparkline.refresh()
+        field = self.query_one("#register_value_field", RegisterValueField)
+        register = self.app.register
+        history = self.app.historyStore.get(self.app.historyKey(self.app.registerPath)) \
+            if register is not None and self.app.registerPath is not None else None
+        element = field.currentElement()
+        if history is None or len(history) == 0 or element >= register.info.getNumberOfElements() or \
+                self.app.channel >= register.info.getNumberOfChannels():
+            sparkline.data = []
+            return
+        values = history.series(self.app.channel, element, max(sparkline.size.width, 1))
+        if field.converter is not None:
+            values = field.converter.cookedValues(values)
+        sparkline.data = values.tolist()
+
+    @on(DataTable.CellHighlighted)
+    @on(VirtualContentTable.CursorMoved)
+    def _cursor_moved(self) -> None:
+        self.updateSparkline()
 
 
 class RegExValidator(Validator):
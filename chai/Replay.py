@@ -0,0 +1,148 @@
+"""
+Replay of a recording (see chai.Recording) as a virtual device: a DeviceAccess dummy device is created from the map
+file stored in the recording, and the recorded frames are written into the recorded register at the recorded pace.
+The views read the register like the one of any other device.
+"""
+import math
+import threading
+import time
+
+import deviceaccess as da
+
+from chai.Accessors import get_raw_numpy_type
+from chai.Recording import Recording
+
+
+def replay_cdd(recording: Recording) -> str:
+    if recording.mapFile is None:
+        raise RuntimeError(f"The recording {recording.directory} does not contain the map file of the device, it "
+                           "cannot be replayed.")
+    return f"(dummy?map={recording.mapFile})"
+
+
+class Replayer:
+    """
+    Writes the frames of a recording into the replay device. Playback runs in a thread of its own, which is started
+    with the first call of play() or seek(). speed scales the recorded pace, math.inf replays as fast as possible.
+    """
+    recording: Recording
+    device: da.Device
+    speed: float
+    position: int  # index of the frame written last, -1 before the first one
+    playing: bool
+    error: RuntimeError | None
+
+    def __init__(self, recording: Recording, device: da.Device):
+        self.recording = recording
+        self.device = device
+        self.speed = 1.
+        self.position = -1
+        self.playing = False
+        self.error = None
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop = False
+        self._pending: int | None = None  # frame to be written right away, e.g. after seeking
+        self._thread: threading.Thread | None = None
+        self._accessor: da.TwoDRegisterAccessor | None = None
+        self._interrupts: list[da.VoidRegisterAccessor] = []
+
+    def play(self) -> None:
+        with self._lock:
+            if self.position < 0 or self.position >= len(self.recording) - 1:
+                # start from the beginning
+                self._pending = 0
+            self.playing = True
+        self._wake()
+
+    def pause(self) -> None:
+        with self._lock:
+            self.playing = False
+        self._wake()
+
+    def seek(self, index: int) -> None:
+        with self._lock:
+            self._pending = min(max(index, 0), len(self.recording) - 1)
+        self._wake()
+
+    def setSpeed(self, speed: float) -> None:
+        with self._lock:
+            self.speed = speed
+        self._wake()
+
+    def stop(self) -> None:
+        self._stop = True
+        self._changed.set()
+
+    def _wake(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="Replayer")
+            self._thread.start()
+        self._changed.set()
+
+    def _run(self) -> None:
+        # the pace is kept relative to this pair of wall clock and recording time, it is reset on every change
+        anchor: tuple[float, float] | None = None
+        while not self._stop:
+            with self._lock:
+                self._changed.clear()
+                pending, self._pending = self._pending, None
+                playing, speed = self.playing, self.speed
+            if pending is not None:
+                self._write(pending)
+                anchor = None
+                continue
+            if not playing:
+                self._changed.wait()
+                anchor = None
+                continue
+            if self.position >= len(self.recording) - 1:
+                with self._lock:
+                    if self._pending is None and not self._changed.is_set():
+                        self.playing = False
+                continue
+
+            index = self.position + 1
+            if anchor is None:
+                anchor = (time.monotonic(), self.recording.timestamp(self.position))
+            if not math.isinf(speed):
+                due = anchor[0] + (self.recording.timestamp(index) - anchor[1]) / speed
+                if self._changed.wait(max(due - time.monotonic(), 0)):
+                    # paused, seeked or the speed changed meanwhile
+                    anchor = None
+                    continue
+            self._write(index)
+
+    def _write(self, index: int) -> None:
+        try:
+            if self._accessor is None:
+                self._accessor = self._createAccessor()
+            self._accessor.set(self.recording.data(index))
+            self._accessor.write()
+            for interrupt in self._interrupts:
+                interrupt.write()
+        except RuntimeError as e:
+            # e.g. the device has been closed, accessors are created again when playing is resumed
+            self.error = e
+            self._accessor = None
+            with self._lock:
+                self.playing = False
+            return
+        self.error = None
+        self.position = index
+
+    def _createAccessor(self) -> da.TwoDRegisterAccessor:
+        catalogue = self.device.getRegisterCatalogue()
+        path = self.recording.registerPath
+        info = catalogue.getRegister(path)
+        dd = info.getDataDescriptor()
+        raw = bool(self.recording.meta.get("raw"))
+        npType = get_raw_numpy_type(dd.rawDataType() if raw else dd.minimumDataType())
+        if not info.isWriteable() and catalogue.hasRegister(path + ".DUMMY_WRITEABLE"):
+            path += ".DUMMY_WRITEABLE"
+        if self.recording.meta.get("push"):
+            # which interrupt belongs to the register is not part of the catalogue, so all of them are triggered
+            self._interrupts = [self.device.getVoidRegisterAccessor(str(hidden.getRegisterName()))
+                                for hidden in catalogue.hiddenRegisters()
+                                if str(hidden.getRegisterName()).startswith("/DUMMY_INTERRUPT_")]
+        return self.device.getTwoDRegisterAccessor(npType, path, accessModeFlags=[da.AccessMode.raw] if raw else [])
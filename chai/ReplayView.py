@@ -0,0 +1,110 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from MainApp import LayoutApp
+    from chai.Replay import Replayer
+from textual.app import ComposeResult
+from textual.containers import Horizontal
+from textual.widgets import Button, Label, RadioSet, RadioButton, Input
+
+from textual import on
+
+from chai.Utils import InputWithEnterAction
+
+from datetime import datetime
+import math
+
+
+class ReplayControls(Horizontal):
+    """Playback controls, shown on the register screen while the virtual device of a recording is selected."""
+    if TYPE_CHECKING:
+        app: LayoutApp
+
+    speeds = {"radio_speed_1": 1., "radio_speed_10": 10., "radio_speed_100": 100., "radio_speed_max": math.inf}
+
+    def compose(self) -> ComposeResult:
+        yield Button("|<", id="btn_replay_start", tooltip="Back to the first frame")
+        yield Button("<", id="btn_replay_back", tooltip="Previous frame")
+        yield Button("Play", id="btn_replay_play")
+        yield Button(">", id="btn_replay_forward", tooltip="Next frame")
+        yield RadioSet(
+            RadioButton("1×", value=True, id="radio_speed_1"),
+            RadioButton("10×", id="radio_speed_10"),
+            RadioButton("100×", id="radio_speed_100"),
+            RadioButton("max", id="radio_speed_max"),
+            compact=True,
+            id="radio_set_replay_speed")
+        yield InputWithEnterAction(placeholder="Seek [s]", type="number", id="input_replay_seek", compact=True,
+                                   action=self._seek)
+        yield Label("", id="label_replay_position")
+
+    def on_mount(self) -> None:
+        self.display = False
+        self.watch(self.app, "currentDevice", lambda device: self.update())
+        self.set_interval(0.25, self._updatePosition)
+
+    @property
+    def replayer(self) -> Replayer | None:
+        return self.app.replayer
+
+    def update(self) -> None:
+        replayer = self.replayer
+        self.display = replayer is not None
+        if replayer is None:
+            return
+        for radioId, speed in self.speeds.items():
+            if speed == replayer.speed:
+                self.query_one(f"#{radioId}", RadioButton).value = True
+        self._updatePosition()
+
+    def _updatePosition(self) -> None:
+        replayer = self.replayer
+        if replayer is None or not self.screen.is_current:
+            return
+        self.query_one("#btn_replay_play", Button).label = "Pause" if replayer.playing else "Play"
+        recording = replayer.recording
+        position = max(replayer.position, 0)
+        timestamp = recording.timestamp(position)
+        text = (f"Frame {position + 1}/{len(recording)}  {timestamp - recording.timestamp(0):.2f}/"
+                f"{recording.duration:.2f} s  {datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S.%f}")
+        if replayer.error is not None:
+            text += f"  Error: {replayer.error}"
+        self.query_one("#label_replay_position", Label).update(text)
+
+    @on(Button.Pressed, "#btn_replay_play")
+    def _pressed_play(self) -> None:
+        if self.replayer is None:
+            return
+        if self.replayer.playing:
+            self.replayer.pause()
+        else:
+            self.replayer.play()
+        self._updatePosition()
+
+    @on(Button.Pressed, "#btn_replay_start")
+    def _pressed_start(self) -> None:
+        if self.replayer is not None:
+            self.replayer.seek(0)
+
+    @on(Button.Pressed, "#btn_replay_back")
+    def _pressed_back(self) -> None:
+        if self.replayer is not None:
+            self.replayer.seek(self.replayer.position - 1)
+
+    @on(Button.Pressed, "#btn_replay_forward")
+    def _pressed_forward(self) -> None:
+        if self.replayer is not None:
+            self.replayer.seek(self.replayer.position + 1)
+
+    @on(RadioSet.Changed, "#radio_set_replay_speed")
+    def _speed_changed(self, changed: RadioSet.Changed) -> None:
+        if self.replayer is not None and changed.pressed.id is not None:
+            self.replayer.setSpeed(self.speeds[changed.pressed.id])
+
+    def _seek(self) -> None:
+        replayer = self.replayer
+        value = self.query_one("#input_replay_seek", Input).value
+        if replayer is None or value == "":
+            return
+        recording = replayer.recording
+        replayer.seek(recording.indexAt(recording.timestamp(0) + float(value)))
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class SpectrumAnalyser:
+    """
+    Hann-windowed magnitude spectra in dB, averaged over frames. Work buffers are kept between calls and only
+    allocated again when the number of frames, channels or elements changes.
+    """
+
+    def __init__(self):
+        self._shape: tuple[int, ...] = ()
+        self._window = np.empty(0)
+        self._windowed = np.empty(0)
+        self._magnitudes = np.empty(0)
+        self._average = np.empty(0)
+
+    def _allocate(self, shape: tuple[int, ...]) -> None:
+        frames, channels, elements = shape
+        bins = elements // 2 + 1
+        self._shape = shape
+        self._window = np.hanning(elements)
+        # amplitude of a sine at a bin centre becomes its peak value
+        self._scale = 2 / max(self._window.sum(), 1e-12)
+        self._windowed = np.empty(shape)
+        self._magnitudes = np.empty((frames, channels, bins))
+        self._average = np.empty((channels, bins))
+
+    def spectra(self, frames: np.ndarray) -> np.ndarray:
+        """Spectra of frames with the shape (frames, channels, elements), averaged over the frames. Returns the
+        shape (channels, elements // 2 + 1), bin i is at the frequency i / elements of the sample rate."""
+        if frames.shape != self._shape:
+            self._allocate(frames.shape)
+        np.multiply(frames, self._window, out=self._windowed)
+        np.abs(np.fft.rfft(self._windowed, axis=-1), out=self._magnitudes)
+        np.mean(self._magnitudes, axis=0, out=self._average)
+        self._average *= self._scale
+        # avoid log10(0) for empty bins
+        np.maximum(self._average, 1e-12, out=self._average)
+        np.log10(self._average, out=self._average)
+        self._average *= 20
+        return self._average
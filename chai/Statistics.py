@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+
+
+class RunningStatistics:
+    """
+    Per-element mean, standard deviation, minimum and maximum of all frames added since the last reset, updated with
+    Welford's algorithm on whole frames at once. Also the average rate of change of each element between the first
+    and the last frame. Frames are added from the acquisition thread, so all access is guarded by a lock.
+    """
+    count: int
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.count = 0
+            self._shape: tuple[int, ...] = ()
+
+    def _allocate(self, values: np.ndarray, timestamp: float) -> None:
+        self._shape = values.shape
+        self._mean = values.astype(np.float64)
+        self._m2 = np.zeros(values.shape)
+        self._min = self._mean.copy()
+        self._max = self._mean.copy()
+        self._first = self._mean.copy()
+        self._firstTimestamp = timestamp
+        self._last = self._mean.copy()
+        self._lastTimestamp = timestamp
+        self._delta = np.empty(values.shape)
+        self.count = 1
+
+    def add(self, values: np.ndarray, timestamp: float) -> None:
+        """Add a frame with the shape (channels, elements). A frame of another shape restarts the statistics."""
+        with self._lock:
+            if self.count == 0 or values.shape != self._shape:
+                self._allocate(values, timestamp)
+                return
+            self.count += 1
+            # delta = x - mean; mean += delta / n; m2 += delta * (x - mean)
+            np.subtract(values, self._mean, out=self._delta)
+            self._mean += self._delta / self.count
+            self._m2 += self._delta * (values - self._mean)
+            np.minimum(self._min, values, out=self._min)
+            np.maximum(self._max, values, out=self._max)
+            self._last[...] = values
+            self._lastTimestamp = timestamp
+
+    def rows(self, channel: int, start: int, stop: int) -> np.ndarray:
+        """
+        Copy of the statistics of the elements start to stop of a channel, with the columns mean, std, min, max and
+        rate of change per second. Empty without frames.
+        """
+        with self._lock:
+            if self.count == 0 or channel >= self._shape[0]:
+                return np.empty((0, 5))
+            elements = slice(start, stop)
+            mean = self._mean[channel, elements]
+            result = np.empty((len(mean), 5))
+            result[:, 0] = mean
+            # sample standard deviation, 0 for a single frame
+            result[:, 1] = np.sqrt(self._m2[channel, elements] / max(self.count - 1, 1))
+            result[:, 2] = self._min[channel, elements]
+            result[:, 3] = self._max[channel, elements]
+            duration = self._lastTimestamp - self._firstTimestamp
+            if duration > 0:
+                result[:, 4] = (self._last[channel, elements] - self._first[channel, elements]) / duration
+            else:
+                result[:, 4] = 0.
+            return result
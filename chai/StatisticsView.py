@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from MainApp import LayoutApp
+from textual.app import ComposeResult
+from textual.containers import Vertical, Horizontal
+from textual.widgets import Label, Button
+
+from textual import on
+
+from chai.DataView import VirtualContentTable
+from chai.Accessors import AccessorHolder
+
+import deviceaccess as da
+
+
+class StatisticsView(Vertical):
+    """
+    Running statistics of each element of the selected channel, collected from every frame of the continuous read.
+    Raw registers are evaluated in cooked values if the conversion can be vectorised. Only the visible rows are
+    formatted, the table is refreshed at refreshHz while shown.
+    """
+    if TYPE_CHECKING:
+        app: LayoutApp
+
+    columns = ["Mean", "Std", "Min", "Max", "Δ/s"]
+    refreshHz: float = 4.
+
+    _register: AccessorHolder | None = None
+    _channel: int = -1
+
+    def compose(self) -> ComposeResult:
+        yield Horizontal(
+            Label("", id="label_statistics_status"),
+            Button("Reset", id="btn_statistics_reset", tooltip="Start collecting the statistics anew"),
+            classes="small_row",
+            id="statistics_controls"
+        )
+        yield VirtualContentTable(id="statistics_table")
+
+    def on_mount(self) -> None:
+        self.set_interval(1 / self.refreshHz, self._refresh)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        if not self.screen.is_current:
+            return
+        register = self.app.register
+        table = self.query_one("#statistics_table", VirtualContentTable)
+        if register is not self._register or self.app.channel != self._channel:
+            self._register = register
+            self._channel = self.app.channel
+            rowCount = register.info.getNumberOfElements() \
+                if register is not None and isinstance(register.accessor, da.TwoDRegisterAccessor) else 0
+            table.setup(self.columns, rowCount, self._cells)
+        else:
+            table.invalidate()
+
+        statistics = self.app.statistics
+        if register is None:
+            status = "No register selected"
+        elif statistics is None or statistics.count == 0:
+            status = "Statistics are collected while the register is read continuously"
+        else:
+            status = f"{statistics.count} frames, channel {self.app.channel}"
+        self.query_one("#label_statistics_status", Label).update(status)
+
+    def _cells(self, start: int, stop: int) -> list[tuple]:
+        statistics = self.app.statistics
+        if statistics is None:
+            return [("",) * len(self.columns)] * (stop - start)
+        rows = [tuple(f"{value:.6g}" for value in row) for row in statistics.rows(self._channel, start, stop).tolist()]
+        # elements without statistics yet, e.g. before the first frame
+        return rows + [("",) * len(self.columns)] * (stop - start - len(rows))
+
+    @on(Button.Pressed, "#btn_statistics_reset")
+    def _pressed_reset(self) -> None:
+        if self.app.statistics is not None:
+            self.app.statistics.reset()
+        self._refresh()
@@ -0,0 +1,206 @@
+"""
+Follow mode of the command line: registers are acquired continuously and each update is written to stdout. Like
+chai.Cli, this module must not import Textual.
+"""
+import struct
+import sys
+import threading
+from typing import BinaryIO, TextIO
+
+import numpy as np
+import deviceaccess as da
+
+from chai import Accessors
+from chai.Acquisition import Frame, PollAcquisition, PushAcquisition, WatchListAcquisition
+from chai.Cli import shape_value, to_json
+from chai.Conversion import RawConverter
+
+# Header of a binary frame, little endian: length of the frame after this field, timestamp (seconds since the epoch),
+# sequence number, length of the register path, length of the dtype string, number of channels, number of elements.
+# It is followed by the register path (UTF-8), the NumPy dtype string (e.g. "<f8") and the data in C order.
+BINARY_HEADER = struct.Struct("<IdQHHII")
+
+
+def read_binary_frame(stream: BinaryIO) -> tuple[str, float, int, np.ndarray] | None:
+    """Counterpart of BinaryWriter for consumers written in Python. Returns None at the end of the stream."""
+    header = stream.read(BINARY_HEADER.size)
+    if len(header) < BINARY_HEADER.size:
+        return None
+    length, timestamp, sequence, pathLength, dtypeLength, channels, elements = BINARY_HEADER.unpack(header)
+    body = stream.read(length - BINARY_HEADER.size + 4)
+    path = body[:pathLength].decode()
+    dtype = np.dtype(body[pathLength:pathLength + dtypeLength].decode())
+    data = np.frombuffer(body, dtype=dtype, offset=pathLength + dtypeLength).reshape(channels, elements)
+    return path, timestamp, sequence, data
+
+
+class _Writer:
+    """
+    Flushes the stream once flushBytes have been written since the last flush, not after every frame, so high rates
+    do not cost one system call per frame. Follower.run() also flushes at a fixed interval, so updates of slow
+    registers are not held back.
+    """
+    flushBytes: int = 64 * 1024
+
+    def __init__(self, stream: TextIO | BinaryIO):
+        self._stream = stream
+        self._unflushed = 0
+
+    def _written(self, size: int) -> None:
+        self._unflushed += size
+        if self._unflushed >= self.flushBytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._unflushed > 0:
+            self._unflushed = 0
+            self._stream.flush()
+
+
+class NdjsonWriter(_Writer):
+    """One JSON object per line and frame. Non-finite floats (NaN, infinity) are written as null, which keeps the
+    output valid JSON."""
+
+    def write(self, path: str, frame: Frame, data: np.ndarray | None) -> None:
+        value = shape_value(data.tolist()) if data is not None else None
+        line = to_json({"register": path, "timestamp": frame.timestamp.isoformat(), "sequence": frame.sequence,
+                        "value": value}) + "\n"
+        self._stream.write(line)
+        self._written(len(line))
+
+
+class TextWriter(_Writer):
+    """Tab separated lines of register path, timestamp and the values of all channels."""
+
+    def write(self, path: str, frame: Frame, data: np.ndarray | None) -> None:
+        values = "\t".join(map(str, data.ravel().tolist())) if data is not None else ""
+        line = f"{path}\t{frame.timestamp.isoformat()}\t{values}\n"
+        self._stream.write(line)
+        self._written(len(line))
+
+
+class BinaryWriter(_Writer):
+    """Length-prefixed binary frames, see BINARY_HEADER."""
+
+    def write(self, path: str, frame: Frame, data: np.ndarray | None) -> None:
+        if data is None:
+            data = np.zeros((0, 0))
+        data = np.ascontiguousarray(data)
+        encodedPath = path.encode()
+        dtype = data.dtype.str.encode()
+        length = BINARY_HEADER.size - 4 + len(encodedPath) + len(dtype) + data.nbytes
+        self._stream.write(BINARY_HEADER.pack(length, frame.timestamp.timestamp(), frame.sequence, len(encodedPath),
+                                              len(dtype), data.shape[0], data.shape[1]))
+        self._stream.write(encodedPath)
+        self._stream.write(dtype)
+        self._stream.write(data.data)
+        self._written(length + 4)
+
+
+class Follower:
+    """
+    Acquires the given registers until stopped or until count frames have been written. Polled registers are read
+    together at the given rate, every update of a push-type register is written.
+    """
+    count: int | None
+    written: int
+    error: Exception | None
+    flushInterval: float = 0.1  # seconds, output is flushed at least this often
+
+    def __init__(self, device: da.Device, catalogue: da.RegisterCatalogue, paths: list[str], hz: float,
+                 writer: NdjsonWriter | TextWriter | BinaryWriter, raw: bool = False, count: int | None = None):
+        self.count = count
+        self.written = 0
+        self.error = None
+        self._writer = writer
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._converters: dict[str, RawConverter] = {}
+        self._acquisitions: list[PollAcquisition | PushAcquisition | WatchListAcquisition] = []
+
+        polled: dict[str, da.TransferElementBase] = {}
+        pushed: dict[str, da.TransferElementBase] = {}
+        for path in paths:
+            register = Accessors.create_accessor_holder(device, catalogue, path)
+            accessor = register.createReadAccessor(device)
+            if not raw and da.AccessMode.raw in register.flags:
+                self._converters[path] = RawConverter(accessor, register.info)
+            (pushed if da.AccessMode.wait_for_new_data in register.flags else polled)[path] = accessor
+
+        if len(polled) == 1:
+            path, accessor = next(iter(polled.items()))
+            self._acquisitions.append(PollAcquisition(
+                accessor, hz, lambda frame, path=path: self._write(path, frame), self._failed))
+        elif len(polled) > 1:
+            self._acquisitions.append(WatchListAcquisition(polled, {}, hz, self._writeAll, self._failed))
+        for path, accessor in pushed.items():
+            self._acquisitions.append(PushAcquisition(
+                accessor, lambda frame, path=path: self._write(path, frame), self._failed))
+
+    def _write(self, path: str, frame: Frame) -> None:
+        data = frame.data
+        converter = self._converters.get(path)
+        if converter is not None and data is not None:
+            # called from the acquisition thread right after the read, so the accessor still holds the frame
+            data = converter.cookedFrame(data)
+        with self._lock:
+            if self._done.is_set():
+                return
+            try:
+                self._writer.write(path, frame, data)
+            except (BrokenPipeError, ValueError) as e:
+                # the consumer has gone away
+                self.error = e
+                self._done.set()
+                return
+            self.written += 1
+            if self.count is not None and self.written >= self.count:
+                self._done.set()
+
+    def _writeAll(self, frames: dict[str, Frame]) -> None:
+        for path, frame in frames.items():
+            self._write(path, frame)
+
+    def _flush(self) -> None:
+        with self._lock:
+            if isinstance(self.error, (BrokenPipeError, ValueError)):
+                # the consumer has gone away
+                return
+            try:
+                self._writer.flush()
+            except (BrokenPipeError, ValueError) as e:
+                self.error = e
+                self._done.set()
+
+    def _failed(self, exception: RuntimeError) -> None:
+        self.error = exception
+        self._done.set()
+
+    def run(self) -> None:
+        """Acquire until done, or until interrupted with Ctrl+C."""
+        threads = [threading.Thread(target=acquisition.run, daemon=True) for acquisition in self._acquisitions]
+        for thread in threads:
+            thread.start()
+        try:
+            # wait with a timeout, so Ctrl+C is not blocked
+            while not self._done.wait(self.flushInterval):
+                self._flush()
+                if not any(thread.is_alive() for thread in threads):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._done.set()
+            for acquisition in self._acquisitions:
+                acquisition.stop()
+            for thread in threads:
+                thread.join(1)
+            self._flush()
+
+
+def create_writer(outputFormat: str) -> NdjsonWriter | TextWriter | BinaryWriter:
+    if outputFormat == "binary":
+        return BinaryWriter(sys.stdout.buffer)
+    if outputFormat == "text":
+        return TextWriter(sys.stdout)
+    return NdjsonWriter(sys.stdout)
@@ -0,0 +1,154 @@
+"""
+Latency and jitter of the continuous read. The acquisition thread stamps each frame with time.monotonic() when the
+read was scheduled, requested and completed, the UI adds when it started and finished showing the frame. The
+durations between these stamps are collected in histograms.
+"""
+from __future__ import annotations
+import bisect
+import json
+import re
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from chai.Acquisition import Frame
+
+
+class Histogram:
+    """
+    Counts of durations in logarithmic bins from 1 µs to 100 s, binsPerDecade per decade. Percentiles are accurate to
+    the width of a bin, about 5 %, the maximum is exact.
+    """
+    lowest: float = 1e-6
+    decades: int = 8
+    binsPerDecade: int = 50
+
+    count: int
+    total: float
+    max: float
+
+    def __init__(self):
+        self.edges = [self.lowest * 10 ** (i / self.binsPerDecade)
+                      for i in range(self.decades * self.binsPerDecade + 1)]
+        # one more bin below the lowest and above the highest edge
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect.bisect_right(self.edges, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.
+
+    def percentile(self, percent: float) -> float:
+        """Upper edge of the bin the percentile falls into, at most the maximum."""
+        if self.count == 0:
+            return 0.
+        rank = percent / 100 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count > 0:
+                return min(self.edges[index], self.max) if index < len(self.edges) else self.max
+        return self.max
+
+    def toDict(self) -> dict:
+        # only occupied bins, by their upper edge
+        bins = {f"{self.edges[index]:.3g}" if index < len(self.edges) else "inf": count
+                for index, count in enumerate(self.counts) if count > 0}
+        return {"count": self.count, "mean": self.mean, "p50": self.percentile(50), "p99": self.percentile(99),
+                "max": self.max, "bins": bins}
+
+
+class ReadTiming:
+    """
+    Timing of the continuous read of one register, in seconds:
+
+    - schedule: how late a poll was requested after its scheduled time
+    - transfer: from the request until the data was read, polls only, push reads include waiting for the data
+    - interval: between the completion of consecutive reads
+    - jitter: deviation of the interval from the configured period, polls only
+    - hand-over: from the completion of the read until the UI started to show the frame
+    - render: updating the views with the frame
+
+    Frames are added from the acquisition thread, renders from the UI, so all access is guarded by a lock.
+    """
+    stages = ["schedule", "transfer", "interval", "jitter", "hand-over", "render"]
+
+    hz: float | None  # configured poll rate, None for push
+    renderHz: float
+    missedDeadlines: int  # reads completed after the next one was due
+    missedRenders: int  # renders taking longer than the render period
+
+    def __init__(self, hz: float | None, renderHz: float, meta: dict | None = None):
+        self.hz = hz
+        self.renderHz = renderHz
+        self.meta = meta or {}
+        self.started = datetime.now()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms = {stage: Histogram() for stage in self.stages}
+            self.missedDeadlines = 0
+            self.missedRenders = 0
+            self._lastTransferred: float | None = None
+
+    def acquired(self, frame: Frame) -> None:
+        with self._lock:
+            if frame.scheduled is not None and self.hz is not None:
+                self.histograms["schedule"].add(max(frame.requested - frame.scheduled, 0.))
+                self.histograms["transfer"].add(frame.transferred - frame.requested)
+                if frame.transferred > frame.scheduled + 1 / self.hz:
+                    self.missedDeadlines += 1
+            if self._lastTransferred is not None:
+                interval = frame.transferred - self._lastTransferred
+                self.histograms["interval"].add(interval)
+                if self.hz is not None:
+                    self.histograms["jitter"].add(abs(interval - 1 / self.hz))
+            self._lastTransferred = frame.transferred
+
+    def rendered(self, frame: Frame, started: float, finished: float) -> None:
+        with self._lock:
+            self.histograms["hand-over"].add(max(started - frame.transferred, 0.))
+            self.histograms["render"].add(finished - started)
+            if finished - started > 1 / self.renderHz:
+                self.missedRenders += 1
+
+    def percentile(self, stage: str, percent: float) -> float:
+        with self._lock:
+            return self.histograms[stage].percentile(percent)
+
+    def summary(self) -> dict[str, tuple[int, float, float, float]]:
+        """(count, p50, p99, max) of each stage."""
+        with self._lock:
+            return {stage: (histogram.count, histogram.percentile(50), histogram.percentile(99), histogram.max)
+                    for stage, histogram in self.histograms.items()}
+
+    def dump(self, path: str) -> None:
+        with self._lock:
+            report = {
+                "meta": self.meta,
+                "started": self.started.isoformat(),
+                "dumped": datetime.now().isoformat(),
+                "pollHz": self.hz,
+                "renderHz": self.renderHz,
+                "missedDeadlines": self.missedDeadlines,
+                "missedRenders": self.missedRenders,
+                "stages": {stage: histogram.toDict() for stage, histogram in self.histograms.items()},
+            }
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+def timing_name(deviceAlias: str | None) -> str:
+    device = re.sub(r"[^A-Za-z0-9_.-]+", "_", deviceAlias or "device").strip("_")
+    return f"chai_timing_{device}_{datetime.now():%Y%m%d_%H%M%S}.json"
@@ -0,0 +1,79 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from MainApp import LayoutApp
+from textual.app import ComposeResult
+from textual.containers import Vertical, Horizontal
+from textual.widgets import Label, Button, DataTable
+
+from textual import on
+
+from chai.Timing import ReadTiming, timing_name
+
+import os
+
+
+class TimingView(Vertical):
+    """Latency and jitter of the last continuous read of the selected register, refreshed at refreshHz while shown."""
+    if TYPE_CHECKING:
+        app: LayoutApp
+
+    refreshHz: float = 2.
+
+    def compose(self) -> ComposeResult:
+        yield Horizontal(
+            Label("", id="label_timing_status"),
+            Button("Reset", id="btn_timing_reset", tooltip="Clear the histograms"),
+            Button("Save", id="btn_timing_save", tooltip="Write the histograms to a JSON file"),
+            classes="small_row",
+            id="timing_controls"
+        )
+        table = DataTable(id="timing_table", cursor_type="row")
+        table.add_columns("Stage", "Count", "p50 [ms]", "p99 [ms]", "Max [ms]")
+        yield table
+
+    def on_mount(self) -> None:
+        self.set_interval(1 / self.refreshHz, self._refresh)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        if not self.screen.is_current:
+            return
+        timing = self.app.readTiming
+        table = self.query_one("#timing_table", DataTable)
+        table.clear()
+        if timing is None:
+            self.query_one("#label_timing_status", Label).update(
+                "Timing is measured while a register is read continuously")
+            return
+        for stage, (count, p50, p99, maximum) in timing.summary().items():
+            table.add_row(stage, str(count), f"{p50 * 1000:.3g}", f"{p99 * 1000:.3g}", f"{maximum * 1000:.3g}")
+        self.query_one("#label_timing_status", Label).update(self._status(timing))
+
+    def _status(self, timing: ReadTiming) -> str:
+        register = timing.meta.get("registerPath") or ""
+        if timing.hz is None:
+            rate = "push"
+        else:
+            rate = f"poll {timing.hz:g} Hz, {timing.missedDeadlines} missed deadlines"
+        return f"{register}: {rate}, render {timing.renderHz:g} Hz, {timing.missedRenders} slow renders"
+
+    @on(Button.Pressed, "#btn_timing_reset")
+    def _pressed_reset(self) -> None:
+        if self.app.readTiming is not None:
+            self.app.readTiming.reset()
+        self._refresh()
+
+    @on(Button.Pressed, "#btn_timing_save")
+    def _pressed_save(self) -> None:
+        timing = self.app.readTiming
+        if timing is None:
+            self.notify("No timing measured yet.", severity="warning")
+            return
+        path = os.path.join(self.app.recordingDirectory, timing_name(self.app.deviceAlias))
+        try:
+            timing.dump(path)
+        except OSError as e:
+            self.notify(str(e), title="Could not save the timing", severity="error")
+            return
+        self.notify(f"Timing saved to {path}")
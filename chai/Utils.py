@@ -1,19 +1,15 @@
-import numpy as np
-import deviceaccess as da
 from textual.widgets import Input
+from textual.widget import Widget
+from textual.dom import DOMNode, NoScreen
 from collections.abc import Callable
-
-
-def get_raw_numpy_type(raw_type):
-    conversion = {
-        "none": None, "int8": np.int8, "uint8": np.uint8, "int16": np.int16,
-        "uint16": np.uint16, "int32": np.int32, "uint32": np.uint32, "int64": np.int64,
-        "uint64": np.uint64, "float32": np.float32, "float64": np.float64, "string": str,
-        "Boolean": bool, "Void": "void", "unknown": "unknown"}
-    return conversion[raw_type.getAsString()]
+from itertools import count
+from weakref import WeakKeyDictionary
+import inspect
 
 
 def build_data_type_string(data_desriptor) -> str:
+    import deviceaccess as da
+
     type_string = str(data_desriptor.fundamentalType())
     if data_desriptor.fundamentalType() == da.FundamentalType.numeric:
         type_string = "unsigned"
@@ -26,17 +22,6 @@ def build_data_type_string(data_desriptor) -> str:
     return type_string.title()
 
 
-class AccessorHolder:
-    def __init__(self, accessor: da.TransferElementBase, info: da.RegisterInfo,
-                 dummyWriteAccessor: da.TransferElementBase | None):
-        self.accessor = accessor
-        self.dummyWriteAccessor = dummyWriteAccessor
-        self.info = info
-    accessor: da.TransferElementBase
-    dummyWriteAccessor: da.TransferElementBase | None
-    info: da.RegisterInfo
-
-
 class InputWithEnterAction(Input):
     action: Callable[[], None] = lambda: None
 
@@ -47,3 +32,62 @@ class InputWithEnterAction(Input):
     def _key_enter(self, key) -> None:
         if key.key == "enter":
             self.action()
+
+
+# callbacks of watch_when_shown() which have been skipped while the screen of the widget was hidden, keyed by the
+# order of registration
+_pendingWatchers: WeakKeyDictionary[Widget, dict[int, Callable[[], None]]] = WeakKeyDictionary()
+_watcherKeys = count()
+
+
+def watch_when_shown(widget: Widget, obj: DOMNode, attribute: str, callback: Callable,
+                     catchUp: Callable[[], None] | None = None) -> None:
+    """
+    Like widget.watch(obj, attribute, callback), but while the screen of the widget is hidden, changes only mark the
+    callback as pending. Pending callbacks are invoked once with the current value when the screen is shown again
+    (the old value is None then), or catchUp is invoked instead if given.
+    """
+    nParameters = len(inspect.signature(callback).parameters)
+
+    def invoke(old, new) -> None:
+        if nParameters == 0:
+            callback()
+        elif nParameters == 1:
+            callback(new)
+        else:
+            callback(old, new)
+
+    if widget not in _pendingWatchers:
+        _pendingWatchers[widget] = {}
+        widget.app.screen_change_signal.subscribe(widget, lambda screen: _catch_up(widget))
+    pending = _pendingWatchers[widget]
+    key = next(_watcherKeys)
+
+    def watcher(old, new) -> None:
+        if _is_shown(widget):
+            invoke(old, new)
+        else:
+            pending[key] = catchUp if catchUp is not None else lambda: invoke(None, getattr(obj, attribute))
+
+    widget.watch(obj, attribute, watcher)
+
+
+def _is_shown(widget: Widget) -> bool:
+    try:
+        return widget.screen.is_current
+    except NoScreen:
+        return False
+
+
+def _catch_up(widget: Widget) -> None:
+    pending = _pendingWatchers.get(widget)
+    if not pending or not _is_shown(widget):
+        return
+    callbacks = []
+    for key in sorted(pending):
+        # several attributes might share the same catch up, e.g. a full update of the widget
+        if pending[key] not in callbacks:
+            callbacks.append(pending[key])
+    pending.clear()
+    for callback in callbacks:
+        callback()
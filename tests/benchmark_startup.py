@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of chai.MainApp and time until the first screen is shown, each measured in a fresh
+interpreter. Prints one JSON object with the median times in ms. With --max-first-screen-ms the exit code is 1 if the
+time to the first screen exceeds the limit, so regressions can fail a CI job.
+
+    python3 tests/benchmark_startup.py --runs 5 --max-first-screen-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# executed in a fresh interpreter for each run
+_MEASUREMENT = """
+import json, sys, time
+start = time.perf_counter()
+from chai.MainApp import LayoutApp
+imported = time.perf_counter()
+
+result = {}
+
+async def auto_pilot(pilot):
+    # the app is ready once the first screen has been composed and painted
+    result["firstScreen"] = time.perf_counter()
+    pilot.app.exit()
+
+LayoutApp().run(headless=True, auto_pilot=auto_pilot)
+print(json.dumps({"import": (imported - start) * 1000, "firstScreen": (result["firstScreen"] - start) * 1000,
+                  "deviceaccessLoaded": "deviceaccess" in sys.modules, "numpyLoaded": "numpy" in sys.modules}))
+"""
+
+
+def measure() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", _MEASUREMENT], cwd=root, capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-first-screen-ms", type=float)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    result = {
+        "importMs": round(statistics.median(run["import"] for run in runs), 1),
+        "firstScreenMs": round(statistics.median(run["firstScreen"] for run in runs), 1),
+        "deviceaccessLoaded": any(run["deviceaccessLoaded"] for run in runs),
+        "numpyLoaded": any(run["numpyLoaded"] for run in runs),
+        "runs": args.runs,
+    }
+    print(json.dumps(result))
+    if args.max_first_screen_ms is not None and result["firstScreenMs"] > args.max_first_screen_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())